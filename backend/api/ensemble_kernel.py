@@ -0,0 +1,34 @@
+"""
+Ensemble kernel for Apollon - ZK Oracle price predictions
+Scalar math for the four-model ensemble
+"""
+
+import math
+
+# Ensemble weights in model order: lstm, gru, prophet, xgboost
+MODEL_WEIGHTS = (0.35, 0.25, 0.25, 0.15)
+
+
+def ensemble_kernel(current_price, tf_mult, r0, r1, r2, r3):
+    """Apply per-model returns r0..r3 (scaled by tf_mult) to current_price.
+
+    Returns (lstm, gru, prophet, xgboost, ensemble, std), where ensemble is
+    the weighted prediction and std the population spread across models.
+    """
+    w0, w1, w2, w3 = MODEL_WEIGHTS
+    lstm = current_price * (1.0 + r0 * tf_mult)
+    gru = current_price * (1.0 + r1 * tf_mult)
+    prophet = current_price * (1.0 + r2 * tf_mult)
+    xgboost = current_price * (1.0 + r3 * tf_mult)
+    ensemble = w0 * lstm + w1 * gru + w2 * prophet + w3 * xgboost
+    mean = (lstm + gru + prophet + xgboost) * 0.25
+    std = math.sqrt(
+        (
+            (lstm - mean) ** 2
+            + (gru - mean) ** 2
+            + (prophet - mean) ** 2
+            + (xgboost - mean) ** 2
+        )
+        * 0.25
+    )
+    return lstm, gru, prophet, xgboost, ensemble, std
@@ -4,18 +4,27 @@ Provides cross-chain token swap/bridge and intent-based prediction payments
 via the NEAR Intents 1Click API (https://1click.chaindefuser.com)
 """
 
+import asyncio
+import functools
 import logging
+import sys
 import time
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+import msgspec
 
 logger = logging.getLogger(__name__)
 
 # 1Click API base URL
 ONECLICK_BASE_URL = "https://1click.chaindefuser.com"
 
+# Status polls get a short pool-acquire timeout so a saturated pool fails
+# fast instead of queueing polls behind slower quote/deposit calls.
+STATUS_TIMEOUT = httpx.Timeout(10.0, connect=3.0, pool=1.0)
+
 # Supported chain display metadata
 CHAIN_METADATA = {
     "near": {"name": "NEAR Protocol", "icon": "near", "type": "near"},
@@ -38,8 +47,86 @@ CHAIN_METADATA = {
     "litecoin": {"name": "Litecoin", "icon": "litecoin", "type": "bitcoin"},
 }
 
+# Swap status caching: polls of an in-flight swap are absorbed for a short
+# window, final statuses can be reused for longer since they never change
+TERMINAL_STATUSES = frozenset({"SUCCESS", "FAILED", "REFUNDED"})
+STATUS_POLL_TTL = 1.5
+STATUS_TERMINAL_TTL = 30.0
+# Least recently used addresses are evicted past this many cached statuses
+STATUS_CACHE_MAX_ENTRIES = 10_000
+
+# Upper bound on concurrent quote requests issued by request_quotes()
+MAX_CONCURRENT_QUOTES = 10
+
+# Already-lowercase chain ids resolve to a shared interned key without
+# allocating a lowered copy per lookup
+_CHAIN_KEYS = {k: sys.intern(k) for k in CHAIN_METADATA}
+
 # Primary swap pairs (highlighted in UI)
-PRIMARY_CHAINS = ["near", "solana", "ethereum"]
+PRIMARY_CHAINS = frozenset({"near", "solana", "ethereum"})
+
+# Reusable JSON codec for 1Click payloads
+_json_encoder = msgspec.json.Encoder()
+_json_decoder = msgspec.json.Decoder()
+# /v0/tokens is decoded straight into the list-of-objects shape the cache
+# indexes; tokens stay plain dicts because they are returned to API
+# clients verbatim
+_tokens_decoder = msgspec.json.Decoder(List[Dict[str, Any]])
+
+# The Redis token cache is stored as msgpack; the key is versioned so JSON
+# entries written by older deploys are never fed to the msgpack decoder
+TOKEN_CACHE_KEY = "intents:tokens:v2"
+_msgpack_encoder = msgspec.msgpack.Encoder()
+_msgpack_decoder = msgspec.msgpack.Decoder()
+
+
+def _decode(resp: httpx.Response) -> Any:
+    """Decode a 1Click JSON response body straight from bytes."""
+    return _json_decoder.decode(resp.content)
+
+
+class QuoteRequest(msgspec.Struct, kw_only=True, rename="camel"):
+    """Body of a 1Click /v0/quote request (encoded with camelCase keys)."""
+
+    dry: bool
+    swap_type: str
+    slippage_tolerance: int
+    origin_asset: str
+    deposit_type: str = "ORIGIN_CHAIN"
+    destination_asset: str
+    amount: str
+    recipient: str
+    recipient_type: str = "DESTINATION_CHAIN"
+    refund_to: str
+    refund_type: str = "ORIGIN_CHAIN"
+    deadline: str
+    quote_waiting_time_ms: int = 3000
+
+
+def _utc_deadline(minutes: int) -> str:
+    """Format now + minutes as an ISO-8601 UTC timestamp (e.g. 2025-01-01T12:00:00Z)."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + minutes * 60))
+
+
+def _build_chain_list(by_chain: Dict[str, List[Dict]]) -> List[Dict]:
+    """Build the chain list (primary chains first, then by name) from the index."""
+    chains = []
+
+    for blockchain in by_chain:
+        if blockchain:
+            meta = CHAIN_METADATA.get(blockchain, {})
+            chains.append(
+                {
+                    "id": blockchain,
+                    "name": meta.get("name", blockchain.title()),
+                    "icon": meta.get("icon", blockchain),
+                    "type": meta.get("type", "unknown"),
+                    "is_primary": blockchain in PRIMARY_CHAINS,
+                }
+            )
+
+    chains.sort(key=lambda c: (not c["is_primary"], c["name"]))
+    return chains
 
 
 class IntentsServiceError(Exception):
@@ -52,6 +139,32 @@ class IntentsServiceError(Exception):
         super().__init__(message)
 
 
+def _api_call(operation: str):
+    """Translate failures of a 1Click API call into IntentsServiceError."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except httpx.HTTPStatusError as e:
+                status_code = e.response.status_code
+                error_body = e.response.text
+                logger.error("%s failed: %s - %s", operation, status_code, error_body)
+                raise IntentsServiceError(
+                    f"{operation} failed: {status_code}",
+                    status_code=status_code,
+                    details=error_body,
+                )
+            except Exception as e:
+                logger.error("%s error: %s", operation, e)
+                raise IntentsServiceError(f"{operation} failed: {str(e)}")
+
+        return wrapper
+
+    return decorator
+
+
 class IntentsService:
     """
     Client for NEAR Intents 1Click API.
@@ -64,16 +177,47 @@ class IntentsService:
         self._token_cache: Optional[Dict] = None
         self._token_cache_time: float = 0
         self._cache_ttl = 300  # 5 minutes
-
-    def _get_headers(self) -> Dict[str, str]:
-        """Get request headers with optional API key auth."""
-        headers = {
+        # Past the TTL, cached tokens are still served (and refreshed in the
+        # background) until they are this old
+        self._stale_ttl = 1800  # 30 minutes
+        # Single-flight guard so concurrent cache misses share one refresh
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # deposit address -> (expires_at, status) in LRU order, plus
+        # in-flight status fetches
+        self._status_cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._status_inflight: Dict[str, asyncio.Task] = {}
+        self._quote_semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUOTES)
+
+        # Request headers (with optional API key auth) are built once and
+        # attached to the pooled client
+        self._headers: Dict[str, str] = {
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        return headers
+        if api_key:
+            self._headers["Authorization"] = f"Bearer {api_key}"
+
+        # Shared pooled client: keeps TCP/TLS connections to 1Click alive
+        # across calls instead of re-handshaking on every request. HTTP/2
+        # lets bursts of status polls multiplex over a single connection.
+        self._client = httpx.AsyncClient(
+            base_url=ONECLICK_BASE_URL,
+            headers=self._headers,
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=60.0,
+            ),
+            http2=True,
+        )
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        await self._client.aclose()
 
     # -------------------------------------------------------------------------
     # Token / Chain Discovery
@@ -82,109 +226,132 @@ class IntentsService:
     async def get_supported_tokens(self, force_refresh: bool = False) -> List[Dict]:
         """
         Fetch supported tokens from 1Click API.
-        Results are cached for 5 minutes (in-memory or Redis).
+        Results are cached for 5 minutes (in-memory or Redis); after that the
+        stale list keeps being served for up to 30 minutes while a background
+        refresh runs.
         """
         # Check in-memory cache
-        if (
-            not force_refresh
-            and self._token_cache
+        if not force_refresh and self._token_cache is not None:
+            age = time.time() - self._token_cache_time
+            if age < self._cache_ttl:
+                return self._token_cache["tokens"]
+            if age < self._stale_ttl:
+                self._schedule_refresh()
+                return self._token_cache["tokens"]
+
+        return await self._refresh_tokens(force_refresh)
+
+    def _schedule_refresh(self) -> None:
+        """Start a background token refresh unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self._refresh_tokens()
+        except Exception as e:
+            logger.warning("Background token refresh failed: %s", e)
+
+    def _token_cache_is_fresh(self) -> bool:
+        return (
+            self._token_cache is not None
             and (time.time() - self._token_cache_time) < self._cache_ttl
-        ):
-            return self._token_cache["tokens"]
+        )
 
+    async def _refresh_tokens(self, force_refresh: bool = False) -> List[Dict]:
+        """Refresh the token cache; concurrent callers share a single fetch."""
+        seen_cache_time = self._token_cache_time
+        async with self._refresh_lock:
+            # Another caller refreshed the cache while we waited for the lock
+            refreshed = self._token_cache_time != seen_cache_time
+            if self._token_cache is not None and refreshed:
+                return self._token_cache["tokens"]
+            if not force_refresh and self._token_cache_is_fresh():
+                return self._token_cache["tokens"]
+            return await self._load_tokens(force_refresh)
+
+    async def _load_tokens(self, force_refresh: bool) -> List[Dict]:
+        """Load tokens from Redis or the 1Click API and populate the cache."""
         # Check Redis cache
         if self.redis and not force_refresh:
             try:
-                cached = await self.redis.get("intents:tokens")
+                cached = await self.redis.get(TOKEN_CACHE_KEY)
                 if cached:
-                    import json
-
-                    cache_data = json.loads(cached)
-                    self._token_cache = cache_data
-                    self._token_cache_time = time.time()
+                    cache_data = _msgpack_decoder.decode(cached)
+                    self._set_token_cache(cache_data)
                     return cache_data["tokens"]
             except Exception as e:
-                logger.warning(f"Redis cache read failed: {e}")
+                logger.warning("Redis cache read failed: %s", e)
 
         # Fetch from 1Click API
-        try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.get(
-                    f"{ONECLICK_BASE_URL}/v0/tokens",
-                    headers=self._get_headers(),
+        tokens = await self._fetch_tokens()
+
+        # Cache the result
+        cache_data = {"tokens": tokens, "fetched_at": datetime.now().isoformat()}
+        self._set_token_cache(cache_data)
+
+        # Store in Redis if available
+        if self.redis:
+            try:
+                await self.redis.setex(
+                    TOKEN_CACHE_KEY,
+                    self._cache_ttl,
+                    _msgpack_encoder.encode(cache_data),
                 )
-                resp.raise_for_status()
-                tokens = resp.json()
-
-                # Cache the result
-                cache_data = {"tokens": tokens, "fetched_at": datetime.now().isoformat()}
-                self._token_cache = cache_data
-                self._token_cache_time = time.time()
-
-                # Store in Redis if available
-                if self.redis:
-                    try:
-                        import json
-
-                        await self.redis.setex(
-                            "intents:tokens",
-                            self._cache_ttl,
-                            json.dumps(cache_data),
-                        )
-                    except Exception as e:
-                        logger.warning(f"Redis cache write failed: {e}")
-
-                logger.info(f"Fetched {len(tokens)} tokens from 1Click API")
-                return tokens
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"1Click API error: {e.response.status_code}")
-            raise IntentsServiceError(
-                f"Failed to fetch tokens: {e.response.status_code}",
-                status_code=e.response.status_code,
-            )
-        except Exception as e:
-            logger.error(f"Failed to fetch tokens: {e}")
-            raise IntentsServiceError(f"Failed to fetch tokens: {str(e)}")
+            except Exception as e:
+                logger.warning("Redis cache write failed: %s", e)
+
+        logger.info("Fetched %d tokens from 1Click API", len(tokens))
+        return tokens
+
+    @_api_call("Token fetch")
+    async def _fetch_tokens(self) -> List[Dict]:
+        resp = await self._client.get("/v0/tokens")
+        resp.raise_for_status()
+        return _tokens_decoder.decode(resp.content)
+
+    def _set_token_cache(self, cache_data: Dict) -> Dict:
+        """Install a token cache entry, indexing tokens by blockchain once."""
+        by_chain: Dict[str, List[Dict]] = {}
+        for token in cache_data["tokens"]:
+            key = sys.intern(token.get("blockchain", "").lower())
+            by_chain.setdefault(key, []).append(token)
+
+        # Derived views live only in memory, not in Redis
+        self._token_cache = {
+            **cache_data,
+            "by_chain": by_chain,
+            "chains": _build_chain_list(by_chain),
+        }
+        self._token_cache_time = time.time()
+        return self._token_cache
+
+    async def _ensure_token_cache(self) -> Dict:
+        """Return the current token cache, refreshing it if expired.
+
+        The cache (and its by-chain/chain-list views) is rebuilt once per
+        refresh, so it already acts as a TTL-bound memo for the lookups
+        below; a fresh cache is returned without entering the refresh path.
+        """
+        if self._token_cache_is_fresh():
+            return self._token_cache
+        await self.get_supported_tokens()
+        return self._token_cache
 
     async def get_supported_chains(self) -> List[Dict]:
         """Get list of supported chains with metadata."""
-        tokens = await self.get_supported_tokens()
-
-        # Extract unique chains from token list
-        chains_seen = set()
-        chains = []
-
-        for token in tokens:
-            blockchain = token.get("blockchain", "").lower()
-            if blockchain and blockchain not in chains_seen:
-                chains_seen.add(blockchain)
-                meta = CHAIN_METADATA.get(blockchain, {})
-                chains.append(
-                    {
-                        "id": blockchain,
-                        "name": meta.get("name", blockchain.title()),
-                        "icon": meta.get("icon", blockchain),
-                        "type": meta.get("type", "unknown"),
-                        "is_primary": blockchain in PRIMARY_CHAINS,
-                    }
-                )
-
-        # Sort: primary chains first, then alphabetical
-        chains.sort(key=lambda c: (not c["is_primary"], c["name"]))
-        return chains
+        return (await self._ensure_token_cache())["chains"]
 
     async def get_tokens_by_chain(self, chain: str) -> List[Dict]:
         """Get tokens filtered by blockchain."""
-        tokens = await self.get_supported_tokens()
-        return [
-            t for t in tokens if t.get("blockchain", "").lower() == chain.lower()
-        ]
+        by_chain = (await self._ensure_token_cache())["by_chain"]
+        return by_chain.get(_CHAIN_KEYS.get(chain) or chain.lower(), [])
 
     # -------------------------------------------------------------------------
     # Swap / Quote
     # -------------------------------------------------------------------------
 
+    @_api_call("Quote request")
     async def request_quote(
         self,
         origin_asset: str,
@@ -214,52 +381,56 @@ class IntentsService:
         Returns:
             Quote response with pricing and deposit details
         """
-        deadline = (datetime.utcnow() + timedelta(minutes=deadline_minutes)).isoformat() + "Z"
-
-        payload = {
-            "dry": dry,
-            "swapType": swap_type,
-            "slippageTolerance": slippage_tolerance,
-            "originAsset": origin_asset,
-            "depositType": "ORIGIN_CHAIN",
-            "destinationAsset": destination_asset,
-            "amount": amount,
-            "recipient": recipient,
-            "recipientType": "DESTINATION_CHAIN",
-            "refundTo": refund_to or recipient,
-            "refundType": "ORIGIN_CHAIN",
-            "deadline": deadline,
-            "quoteWaitingTimeMs": 3000,
-        }
+        deadline = _utc_deadline(deadline_minutes)
 
-        try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.post(
-                    f"{ONECLICK_BASE_URL}/v0/quote",
-                    headers=self._get_headers(),
-                    json=payload,
-                )
-                resp.raise_for_status()
-                quote = resp.json()
+        payload = QuoteRequest(
+            dry=dry,
+            swap_type=swap_type,
+            slippage_tolerance=slippage_tolerance,
+            origin_asset=origin_asset,
+            destination_asset=destination_asset,
+            amount=amount,
+            recipient=recipient,
+            refund_to=refund_to or recipient,
+            deadline=deadline,
+        )
 
-                logger.info(
-                    f"Quote received: {origin_asset} -> {destination_asset}, "
-                    f"amount_in={quote.get('quote', {}).get('amountInFormatted', 'N/A')}, "
-                    f"amount_out={quote.get('quote', {}).get('amountOutFormatted', 'N/A')}"
-                )
-                return quote
-
-        except httpx.HTTPStatusError as e:
-            error_body = e.response.text
-            logger.error(f"Quote request failed: {e.response.status_code} - {error_body}")
-            raise IntentsServiceError(
-                f"Quote request failed: {e.response.status_code}",
-                status_code=e.response.status_code,
-                details=error_body,
+        resp = await self._client.post(
+            "/v0/quote", content=_json_encoder.encode(payload)
+        )
+        resp.raise_for_status()
+        quote = _decode(resp)
+
+        if logger.isEnabledFor(logging.INFO):
+            details = quote.get("quote", {})
+            logger.info(
+                "Quote received: %s -> %s, amount_in=%s, amount_out=%s",
+                origin_asset,
+                destination_asset,
+                details.get("amountInFormatted", "N/A"),
+                details.get("amountOutFormatted", "N/A"),
             )
-        except Exception as e:
-            logger.error(f"Quote request error: {e}")
-            raise IntentsServiceError(f"Quote request failed: {str(e)}")
+        return quote
+
+    async def request_quotes(self, specs: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Request several quotes concurrently (e.g. previews across origin assets).
+
+        Args:
+            specs: Keyword arguments for request_quote, one dict per quote
+
+        Returns:
+            Results in the same order as specs; a failed quote is returned as
+            its IntentsServiceError instead of failing the whole batch.
+        """
+
+        async def bounded(spec: Dict[str, Any]) -> Dict:
+            async with self._quote_semaphore:
+                return await self.request_quote(**spec)
+
+        return await asyncio.gather(
+            *(bounded(spec) for spec in specs), return_exceptions=True
+        )
 
     async def execute_swap(
         self,
@@ -294,6 +465,7 @@ class IntentsService:
     # Deposit & Status
     # -------------------------------------------------------------------------
 
+    @_api_call("Deposit submit")
     async def submit_deposit(
         self,
         tx_hash: str,
@@ -315,28 +487,12 @@ class IntentsService:
         if near_sender_account:
             payload["nearSenderAccount"] = near_sender_account
 
-        try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.post(
-                    f"{ONECLICK_BASE_URL}/v0/deposit/submit",
-                    headers=self._get_headers(),
-                    json=payload,
-                )
-                resp.raise_for_status()
-                result = resp.json()
+        resp = await self._client.post("/v0/deposit/submit", json=payload)
+        resp.raise_for_status()
+        result = _decode(resp)
 
-                logger.info(f"Deposit submitted: {tx_hash} -> {deposit_address}")
-                return result
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Deposit submit failed: {e.response.status_code}")
-            raise IntentsServiceError(
-                f"Deposit submit failed: {e.response.status_code}",
-                status_code=e.response.status_code,
-            )
-        except Exception as e:
-            logger.error(f"Deposit submit error: {e}")
-            raise IntentsServiceError(f"Deposit submit failed: {str(e)}")
+        logger.info("Deposit submitted: %s -> %s", tx_hash, deposit_address)
+        return result
 
     async def get_swap_status(self, deposit_address: str) -> Dict:
         """
@@ -345,28 +501,50 @@ class IntentsService:
         Returns:
             Status object with fields: status, quoteResponse, swapDetails, etc.
             Statuses: PENDING_DEPOSIT, PROCESSING, SUCCESS, INCOMPLETE_DEPOSIT, REFUNDED, FAILED
+
+        Results are cached briefly (longer once the swap is final) and
+        concurrent polls for the same address share one upstream request.
         """
-        try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.get(
-                    f"{ONECLICK_BASE_URL}/v0/status",
-                    headers=self._get_headers(),
-                    params={"depositAddress": deposit_address},
-                )
-                resp.raise_for_status()
-                return resp.json()
-
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return {"status": "NOT_FOUND", "depositAddress": deposit_address}
-            logger.error(f"Status check failed: {e.response.status_code}")
-            raise IntentsServiceError(
-                f"Status check failed: {e.response.status_code}",
-                status_code=e.response.status_code,
+        cached = self._status_cache.get(deposit_address)
+        if cached is not None and cached[0] > time.monotonic():
+            self._status_cache.move_to_end(deposit_address)
+            return cached[1]
+
+        task = self._status_inflight.get(deposit_address)
+        if task is None:
+            task = asyncio.create_task(self._fetch_swap_status(deposit_address))
+            self._status_inflight[deposit_address] = task
+            task.add_done_callback(
+                lambda _: self._status_inflight.pop(deposit_address, None)
             )
-        except Exception as e:
-            logger.error(f"Status check error: {e}")
-            raise IntentsServiceError(f"Status check failed: {str(e)}")
+        # Shield so one cancelled poller does not abort the shared fetch
+        return await asyncio.shield(task)
+
+    async def _fetch_swap_status(self, deposit_address: str) -> Dict:
+        """Fetch a swap status from 1Click and cache it."""
+        status = await self._request_swap_status(deposit_address)
+        ttl = (
+            STATUS_TERMINAL_TTL
+            if status.get("status") in TERMINAL_STATUSES
+            else STATUS_POLL_TTL
+        )
+        self._status_cache[deposit_address] = (time.monotonic() + ttl, status)
+        self._status_cache.move_to_end(deposit_address)
+        if len(self._status_cache) > STATUS_CACHE_MAX_ENTRIES:
+            self._status_cache.popitem(last=False)
+        return status
+
+    @_api_call("Status check")
+    async def _request_swap_status(self, deposit_address: str) -> Dict:
+        resp = await self._client.get(
+            "/v0/status",
+            params={"depositAddress": deposit_address},
+            timeout=STATUS_TIMEOUT,
+        )
+        if resp.status_code == 404:
+            return {"status": "NOT_FOUND", "depositAddress": deposit_address}
+        resp.raise_for_status()
+        return _decode(resp)
 
     # -------------------------------------------------------------------------
     # Intent-based Prediction Payments
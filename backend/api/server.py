@@ -3,18 +3,26 @@ FastAPI Server for Apollon - ZK Oracle Price Prediction Oracle
 Provides REST endpoints for price predictions and oracle data
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Optional, Any
 import asyncio
+import functools
+import hashlib
+import random
 import sys
 import os
+import threading
+import time
 from datetime import datetime
 import logging
 import numpy as np
 import pandas as pd
 import httpx
+import orjson
 import warnings
 
 warnings.filterwarnings("ignore")
@@ -25,27 +33,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Add parent directories to path for imports
+# Make the backend root importable however server is loaded (python server.py,
+# uvicorn server:app, tests); ml_engine and data_aggregator are then imported
+# as regular packages
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, backend_dir)
-sys.path.insert(0, os.path.join(backend_dir, "ml-engine"))
-sys.path.insert(0, os.path.join(backend_dir, "data-aggregator"))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
 
-# Import local modules with error handling
+# Import local modules with error handling. The ensemble predictor pulls in
+# TensorFlow/Keras (seconds of import time), so it is imported on first use in
+# get_predictor() instead of here.
 try:
-    from ensemble_predictor import EnsemblePredictionEngine
-
-    logger.info("✓ Ensemble predictor imported successfully")
-except Exception as e:
-    logger.error(f"✗ Failed to import ensemble_predictor: {e}")
-    EnsemblePredictionEngine = None
-
-try:
-    from price_aggregator import PriceDataAggregator
+    from data_aggregator.price_aggregator import PriceDataAggregator
 
     logger.info("✓ Price aggregator imported successfully")
 except Exception as e:
-    logger.error(f"✗ Failed to import price_aggregator: {e}")
+    logger.error("✗ Failed to import price_aggregator: %s", e)
     PriceDataAggregator = None
 
 try:
@@ -53,14 +56,39 @@ try:
 
     logger.info("✓ ZK integration imported successfully")
 except Exception as e:
-    logger.warning(f"⚠ ZK integration not available: {e}")
+    logger.warning("⚠ ZK integration not available: %s", e)
     zk_integration = None
 
+from ensemble_kernel import MODEL_WEIGHTS, ensemble_kernel
+
+
+def _json_default(obj):
+    """Serialize values orjson does not handle natively"""
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    """Encode a response payload to JSON bytes"""
+    return orjson.dumps(
+        content, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+class APIJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes numpy values and pandas timestamps"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Apollon - ZK Oracle Price Oracle API",
     description="Zero-Knowledge Enhanced Price Prediction Oracle",
     version="2.0.0",
+    default_response_class=APIJSONResponse,
 )
 
 # CORS middleware - allow all origins for development
@@ -72,15 +100,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger payloads (historical series are highly repetitive JSON)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Global instances with lazy initialization
 predictor = None
 data_aggregator = None
+# Bound predictor.predict, resolved once when the predictor is created
+predictor_predict = None
+
+
+# Set once the ML engine import has failed, so it is not retried per call
+_predictor_import_failed = False
+# get_predictor() runs in worker threads; only one of them creates the predictor
+_predictor_lock = threading.Lock()
 
 
 def get_predictor():
-    global predictor
-    if predictor is None and EnsemblePredictionEngine is not None:
-        predictor = EnsemblePredictionEngine()
+    """Return the ensemble predictor, importing the ML engine on first use.
+
+    The first call blocks on the TensorFlow import; call it off the event loop
+    (asyncio.to_thread) where that matters.
+    """
+    global predictor, predictor_predict, _predictor_import_failed
+    if predictor is not None or _predictor_import_failed:
+        return predictor
+    with _predictor_lock:
+        # Another thread may have finished (or failed) while this one waited
+        if predictor is not None or _predictor_import_failed:
+            return predictor
+        try:
+            from ml_engine.ensemble_predictor import EnsemblePredictionEngine
+
+            logger.info("✓ Ensemble predictor imported successfully")
+        except Exception as e:
+            _predictor_import_failed = True
+            logger.error("✗ Failed to import ensemble_predictor: %s", e)
+            return None
+        try:
+            engine = EnsemblePredictionEngine()
+        except Exception as e:
+            logger.error("✗ Failed to create ensemble predictor: %s", e)
+            return None
+        predictor_predict = getattr(engine, "predict", None)
+        predictor = engine
     return predictor
 
 
@@ -91,6 +154,42 @@ def get_data_aggregator():
     return data_aggregator
 
 
+# Shared outbound HTTP client (keep-alive connections reused across requests)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=50,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0,
+            ),
+        )
+    return _http_client
+
+
+# Upstream calls in flight by key; concurrent callers share one task
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+async def single_flight(key: str, fetch):
+    """Run fetch() at most once per key at a time and share its result.
+
+    The task is shielded so a caller that disconnects doesn't cancel the
+    call for everyone else awaiting it."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
 # Pydantic models
 class PredictionRequest(BaseModel):
     symbol: str = "ALGOUSD"
@@ -99,6 +198,8 @@ class PredictionRequest(BaseModel):
     include_technicals: bool = False
 
 
+# Response models are built from trusted, internally assembled data, so
+# handlers use model_construct() and skip validation on the way out
 class PredictionResponse(BaseModel):
     symbol: str
     timeframe: str
@@ -128,21 +229,9 @@ class TechnicalIndicatorsResponse(BaseModel):
     timestamp: str
 
 
-class ZKPredictionResponse(BaseModel):
-    symbol: str
-    timeframe: str
-    predicted_price: float
-    current_price: float
-    price_change: float
-    price_change_percent: float
-    confidence: float
-    confidence_interval: Dict[str, float]
-    individual_predictions: Dict[str, float]
-    model_weights: Dict[str, float]
-    timestamp: str
+class ZKPredictionResponse(PredictionResponse):
     zk_proof: Optional[Dict[str, Any]] = None
     privacy_status: Optional[Dict[str, Any]] = None
-    status: str = "success"
 
 
 # Global state
@@ -154,6 +243,29 @@ app_state = {
 }
 
 
+# Response timestamps are rendered at most once per second
+_ts_cache = ["", 0]
+
+
+def now_iso() -> str:
+    """Current local time in ISO format, cached at one-second granularity"""
+    t = int(time.time())
+    if t != _ts_cache[1]:
+        _ts_cache[:] = [datetime.fromtimestamp(t).isoformat(), t]
+    return _ts_cache[0]
+
+
+# Serialized /price/historical payloads keyed by (days, minute bucket)
+HISTORICAL_CACHE_TTL = 60  # seconds
+_historical_cache: Dict[tuple, bytes] = {}
+
+
+async def iter_ndjson(rows):
+    """Yield rows as newline-delimited JSON, one encoded row at a time"""
+    for row in rows:
+        yield dumps_json(row) + b"\n"
+
+
 # Real price fetching - no more mock base prices
 # Prices are fetched dynamically from CoinGecko and other sources
 _MOCK_BASE_PRICES: dict[str, float] = {}  # Kept for backwards compatibility, not used
@@ -180,69 +292,270 @@ def get_coingecko_id(symbol: str) -> str:
     return SYMBOL_TO_COINGECKO.get(symbol.upper(), symbol.lower())
 
 
+@functools.lru_cache(maxsize=8)
+def _hour_offsets(days: int) -> np.ndarray:
+    """Hourly offsets for a days-long series, oldest first"""
+    return np.arange(days * 24 - 1, -1, -1).astype("timedelta64[h]")
+
+
+@functools.lru_cache(maxsize=8)
+def fallback_timestamps(days: int, now_s: int) -> tuple:
+    """Hourly datetimes ending at now_s (epoch seconds), reused within a second"""
+    now = np.datetime64(datetime.fromtimestamp(now_s), "us")
+    return tuple((now - _hour_offsets(days)).astype(datetime))
+
+
 async def fetch_real_historical_data(days=90, symbol: str = "algorand"):
     """Fetch real historical price data from CoinGecko and other sources"""
     agg = get_data_aggregator()
     if agg:
         try:
-            historical_data = await agg.fetch_historical_data(
-                days=days, symbol=symbol.lower()
+            historical_data = await fetch_history(
+                agg, days=days, symbol=symbol.lower()
             )
             if historical_data and len(historical_data) > 0:
                 return historical_data
         except Exception as e:
-            logger.error(f"Failed to fetch historical data: {e}")
+            logger.error("Failed to fetch historical data: %s", e)
 
     # Last resort: fetch current price and generate minimal data
     try:
         current_data = await get_current_price_from_api(symbol)
         if current_data:
             base_price = current_data.get("price", 0.20)
-            data = []
-            now = datetime.now()
-            for i in range(days * 24):
-                timestamp = now - pd.Timedelta(hours=i)
-                data.append(
-                    {
-                        "datetime": timestamp,
-                        "symbol": symbol.upper() + "USD",
-                        "price": base_price,
-                        "volume": 1000000,
-                    }
-                )
-            return list(reversed(data))
+            pair = symbol.upper() + "USD"
+            timestamps = fallback_timestamps(days, int(time.time()))
+            return [
+                {
+                    "datetime": timestamp,
+                    "symbol": pair,
+                    "price": base_price,
+                    "volume": 1000000,
+                }
+                for timestamp in timestamps
+            ]
     except Exception as e:
-        logger.error(f"Failed to generate fallback data: {e}")
+        logger.error("Failed to generate fallback data: %s", e)
 
     return []
 
 
+# CoinGecko /simple/price quotes keyed by id: (fetched_at, quote). Entries past
+# COINGECKO_PRICE_TTL are refetched, but are still served for up to
+# COINGECKO_STALE_TTL when CoinGecko errors or rate-limits us.
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+COINGECKO_PRICE_TTL = 10.0  # seconds
+COINGECKO_STALE_TTL = 300.0  # seconds
+_coingecko_cache: Dict[str, tuple] = {}
+# When a quote was last asked for; gates the background refresher
+_coingecko_last_demand = float("-inf")
+
+
+def note_quote_demand():
+    global _coingecko_last_demand
+    _coingecko_last_demand = time.monotonic()
+
+
+# Quote requests arriving within COINGECKO_BATCH_WINDOW are sent as a single
+# /simple/price call with a comma-separated ids list
+COINGECKO_BATCH_WINDOW = 0.02  # seconds
+_coingecko_pending: Dict[str, asyncio.Future] = {}
+_coingecko_flush_task: Optional[asyncio.Task] = None
+
+
+# Last ETag and decoded body per ids list, for If-None-Match revalidation
+COINGECKO_ETAG_MAX_ENTRIES = 64
+_coingecko_etags: Dict[str, tuple] = {}
+
+
+async def _request_coingecko_prices(cg_ids: List[str]) -> Dict[str, Any]:
+    """Fetch quotes for several CoinGecko ids in one request, keyed by id"""
+    ids = ",".join(sorted(cg_ids))
+    known = _coingecko_etags.get(ids)
+    resp = await get_http_client().get(
+        COINGECKO_PRICE_URL,
+        params={
+            "ids": ids,
+            "vs_currencies": "usd",
+            "include_24hr_change": "true",
+            "include_24hr_vol": "true",
+            "include_market_cap": "true",
+        },
+        headers={"If-None-Match": known[0]} if known else None,
+    )
+    if resp.status_code == 304 and known:
+        return known[1]
+    resp.raise_for_status()
+    quotes = orjson.loads(resp.content) or {}
+
+    etag = resp.headers.get("etag")
+    if etag:
+        _coingecko_etags.pop(ids, None)
+        if len(_coingecko_etags) >= COINGECKO_ETAG_MAX_ENTRIES:
+            del _coingecko_etags[next(iter(_coingecko_etags))]
+        _coingecko_etags[ids] = (etag, quotes)
+    return quotes
+
+
+# Circuit breaker: after COINGECKO_FAIL_THRESHOLD consecutive failed requests,
+# lookups skip CoinGecko (serving stale quotes or mocks) for COINGECKO_OPEN_SECS;
+# then a single probe request is let through to decide whether to close again
+COINGECKO_FAIL_THRESHOLD = 5
+COINGECKO_OPEN_SECS = 30.0
+_coingecko_failures = 0
+_coingecko_open_until = 0.0
+_coingecko_probing = False
+
+
+def coingecko_circuit_open() -> bool:
+    """True while CoinGecko calls should be skipped"""
+    global _coingecko_probing
+    if _coingecko_failures < COINGECKO_FAIL_THRESHOLD:
+        return False
+    if _coingecko_probing or time.monotonic() < _coingecko_open_until:
+        return True
+    # Half-open: this caller's request is the probe
+    _coingecko_probing = True
+    return False
+
+
+def _record_coingecko_result(ok: bool):
+    global _coingecko_failures, _coingecko_open_until, _coingecko_probing
+    _coingecko_probing = False
+    if ok:
+        _coingecko_failures = 0
+        return
+    _coingecko_failures += 1
+    if _coingecko_failures >= COINGECKO_FAIL_THRESHOLD:
+        _coingecko_open_until = time.monotonic() + COINGECKO_OPEN_SECS
+        logger.warning(
+            "⚠️ CoinGecko circuit open for %.0fs after %d failures",
+            COINGECKO_OPEN_SECS,
+            _coingecko_failures,
+        )
+
+
+async def _flush_coingecko_batch():
+    """Send the pending ids as one request and resolve their futures"""
+    batch = dict(_coingecko_pending)
+    _coingecko_pending.clear()
+    try:
+        quotes = await _request_coingecko_prices(list(batch))
+    except Exception as e:
+        _record_coingecko_result(False)
+        for fut in batch.values():
+            if not fut.done():
+                fut.set_exception(e)
+        return
+    _record_coingecko_result(True)
+    for cg_id, fut in batch.items():
+        if not fut.done():
+            fut.set_result(quotes.get(cg_id))
+
+
+def _start_coingecko_flush():
+    global _coingecko_flush_task
+    _coingecko_flush_task = asyncio.get_running_loop().create_task(
+        _flush_coingecko_batch()
+    )
+
+
+async def _request_coingecko_price(cg_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch one CoinGecko quote as part of the next batch, or None if unknown"""
+    fut = _coingecko_pending.get(cg_id)
+    if fut is None:
+        loop = asyncio.get_running_loop()
+        if not _coingecko_pending:
+            loop.call_later(COINGECKO_BATCH_WINDOW, _start_coingecko_flush)
+        fut = _coingecko_pending[cg_id] = loop.create_future()
+    return await asyncio.shield(fut)
+
+
+async def fetch_coingecko_price(cg_id: str) -> Optional[Dict[str, Any]]:
+    """Return the CoinGecko quote (usd, usd_24h_change, ...) for an id.
+
+    Fresh quotes come from the cache; concurrent misses share one request.
+    """
+    note_quote_demand()
+    entry = _coingecko_cache.get(cg_id)
+    if entry is not None and time.monotonic() - entry[0] < COINGECKO_PRICE_TTL:
+        return entry[1]
+
+    quote = None
+    if not coingecko_circuit_open():
+        try:
+            quote = await single_flight(
+                f"coingecko:{cg_id}", lambda: _request_coingecko_price(cg_id)
+            )
+        except Exception as e:
+            logger.warning("⚠️ CoinGecko fetch failed for %s: %s", cg_id, e)
+    if quote is not None:
+        _coingecko_cache[cg_id] = (time.monotonic(), quote)
+        return quote
+
+    if entry is not None and time.monotonic() - entry[0] < COINGECKO_STALE_TTL:
+        return entry[1]
+    return None
+
+
 async def get_current_price_from_api(symbol: str = "algorand"):
     """Fetch current price from CoinGecko API"""
+    quote = await fetch_coingecko_price(symbol.lower())
+    if quote is None:
+        return None
+    return {
+        "price": quote["usd"],
+        "change_24h": quote.get("usd_24h_change", 0),
+        "volume_24h": quote.get("usd_24h_vol", 0),
+        "market_cap": quote.get("usd_market_cap", 0),
+    }
+
+
+# Aggregator history keyed by (days, symbol); cleared when models are retrained
+HISTORY_CACHE_TTL = 30.0  # seconds
+_history_cache: Dict[tuple, tuple] = {}
+
+
+async def fetch_history(agg, days: int = 30, symbol: str = "algorand"):
+    """Fetch aggregator history, reusing results younger than HISTORY_CACHE_TTL.
+
+    Concurrent misses for the same (days, symbol) share one aggregator call.
+    """
+    key = (days, symbol)
+    entry = _history_cache.get(key)
+    if entry is not None and time.monotonic() < entry[0]:
+        return entry[1]
+
+    data = await single_flight(
+        f"history:{days}:{symbol}",
+        lambda: agg.fetch_historical_data(days=days, symbol=symbol),
+    )
+    if data:
+        now = time.monotonic()
+        expired = [k for k, (expires, _) in _history_cache.items() if expires <= now]
+        for stale in expired:
+            del _history_cache[stale]
+        _history_cache[key] = (now + HISTORY_CACHE_TTL, data)
+    return data
+
+
+def to_soa(records) -> Dict[str, np.ndarray]:
+    """Convert price rows (list of dicts) into one contiguous array per column"""
+    if isinstance(records, dict):
+        return records
+    df = pd.DataFrame(records)
+    return {col: df[col].to_numpy() for col in df.columns}
+
+
+async def fetch_recent_data(agg, symbol: str, days: int = 30):
+    """Fetch recent history for prediction context, or [] on failure"""
+    if not agg:
+        return []
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://api.coingecko.com/api/v3/simple/price",
-                params={
-                    "ids": symbol.lower(),
-                    "vs_currencies": "usd",
-                    "include_24hr_change": "true",
-                    "include_24hr_vol": "true",
-                    "include_market_cap": "true",
-                },
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if data and symbol.lower() in data:
-                    return {
-                        "price": data[symbol.lower()]["usd"],
-                        "change_24h": data[symbol.lower()].get("usd_24h_change", 0),
-                        "volume_24h": data[symbol.lower()].get("usd_24h_vol", 0),
-                        "market_cap": data[symbol.lower()].get("usd_market_cap", 0),
-                    }
+        return await fetch_history(agg, days=days, symbol=symbol)
     except Exception as e:
-        logger.error(f"Failed to fetch price from API: {e}")
-    return None
+        logger.warning("⚠️ Using minimal data: %s", e)
+        return []
 
 
 # Deprecated: Use fetch_real_historical_data instead
@@ -254,6 +567,102 @@ def generate_mock_historical_data(days=90, symbol: str = "ALGOUSD"):
     return []
 
 
+# Shared PCG64 generator for vectorized mock data; only used from the event
+# loop thread. Single scalar draws use the stdlib random module, which avoids
+# the NumPy call overhead.
+rng = np.random.default_rng()
+
+# Ensemble model order, weights and per-model return bounds (before tf scaling)
+MODEL_KEYS = ("lstm", "gru", "prophet", "xgboost")
+_MODEL_WEIGHTS_DICT = dict(zip(MODEL_KEYS, MODEL_WEIGHTS))
+_PRED_LOW = np.array([-0.02, -0.015, -0.01, -0.02])
+_PRED_HIGH = np.array([0.03, 0.025, 0.02, 0.035])
+# One draw per prediction: four model returns plus a unit draw for confidence
+_DRAW_LOW = np.append(_PRED_LOW, 0.0)
+_DRAW_HIGH = np.append(_PRED_HIGH, 1.0)
+MAX_MOCK_CONFIDENCE = 0.95
+
+# Prediction spread per timeframe (keys lower-cased); unknown timeframes use 1.0
+_TF_MULT_PRED = {
+    "1h": 0.0015,
+    "4h": 0.004,
+    "24h": 0.015,
+    "1d": 0.015,
+    "7d": 0.04,
+    "1w": 0.04,
+}
+_TF_MULT_MOCK = {"1h": 0.15, "4h": 0.4, "24h": 1.0, "1d": 1.0, "7d": 2.5, "1w": 2.5}
+
+
+def sample_ensemble(current_price: float, tf_mult: float, min_confidence: float):
+    """Draw all four model predictions and a confidence in a single call.
+
+    Returns the per-model predictions as a list, the weighted ensemble
+    price, the spread (std) across models and a confidence drawn
+    uniformly from [min_confidence, MAX_MOCK_CONFIDENCE)."""
+    r0, r1, r2, r3, unit = rng.uniform(_DRAW_LOW, _DRAW_HIGH).tolist()
+    *preds, ensemble, std = ensemble_kernel(current_price, tf_mult, r0, r1, r2, r3)
+    confidence = min_confidence + unit * (MAX_MOCK_CONFIDENCE - min_confidence)
+    return preds, ensemble, std, confidence
+
+
+def build_prediction(
+    symbol: str,
+    timeframe: str,
+    current_price: float,
+    tf_mult: float,
+    min_confidence: float,
+    data_points_used: int = 720,
+) -> Dict[str, Any]:
+    """Sample the model ensemble around current_price and build the response dict"""
+    preds, ensemble, prediction_std, confidence = sample_ensemble(
+        current_price, tf_mult, min_confidence
+    )
+    price_change = ensemble - current_price
+    price_change_percent = (
+        (price_change / current_price) * 100 if current_price > 0 else 0
+    )
+    half_width = prediction_std * 1.96
+
+    # Round every 6-decimal price field in one vectorized call
+    (
+        predicted,
+        current,
+        change,
+        lower,
+        upper,
+        std,
+        *model_preds,
+    ) = np.round(
+        [
+            ensemble,
+            current_price,
+            price_change,
+            ensemble - half_width,
+            ensemble + half_width,
+            prediction_std,
+            *preds,
+        ],
+        6,
+    ).tolist()
+
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "predicted_price": predicted,
+        "current_price": current,
+        "price_change": change,
+        "price_change_percent": round(price_change_percent, 2),
+        "confidence": round(confidence, 3),
+        "confidence_interval": {"lower": lower, "upper": upper},
+        "individual_predictions": dict(zip(MODEL_KEYS, model_preds)),
+        "model_weights": dict(_MODEL_WEIGHTS_DICT),
+        "prediction_std": std,
+        "timestamp": now_iso(),
+        "data_points_used": data_points_used,
+    }
+
+
 def generate_mock_prediction(
     current_price: float | None = None, symbol: str = "ALGOUSD", timeframe: str = "24h"
 ):
@@ -265,73 +674,83 @@ def generate_mock_prediction(
         current_price = _MOCK_BASE_PRICES.get(symbol.upper(), 0.20)
 
     # Scale the prediction range by timeframe
-    tf_mult = 1.0
-    if timeframe in ("1h", "1H"):
-        tf_mult = 0.15
-    elif timeframe in ("4h", "4H"):
-        tf_mult = 0.4
-    elif timeframe in ("24h", "24H", "1d"):
-        tf_mult = 1.0
-    elif timeframe in ("7d", "1w"):
-        tf_mult = 2.5
-
-    # Generate individual model predictions
-    lstm_pred = current_price * (1 + np.random.uniform(-0.02, 0.03) * tf_mult)
-    gru_pred = current_price * (1 + np.random.uniform(-0.015, 0.025) * tf_mult)
-    prophet_pred = current_price * (1 + np.random.uniform(-0.01, 0.02) * tf_mult)
-    xgboost_pred = current_price * (1 + np.random.uniform(-0.02, 0.035) * tf_mult)
-
-    # Weighted ensemble
-    weights = {"lstm": 0.35, "gru": 0.25, "prophet": 0.25, "xgboost": 0.15}
-    ensemble = (
-        lstm_pred * weights["lstm"]
-        + gru_pred * weights["gru"]
-        + prophet_pred * weights["prophet"]
-        + xgboost_pred * weights["xgboost"]
-    )
-
-    prediction_std = np.std([lstm_pred, gru_pred, prophet_pred, xgboost_pred])
+    tf_mult = _TF_MULT_MOCK.get(timeframe.lower(), 1.0)
 
-    return {
-        "symbol": symbol,
-        "timeframe": timeframe,
-        "predicted_price": round(ensemble, 6),
-        "current_price": round(current_price, 6),
-        "price_change": round(ensemble - current_price, 6),
-        "price_change_percent": round(
-            ((ensemble - current_price) / current_price) * 100, 2
-        ),
-        "confidence": round(np.random.uniform(0.7, 0.95), 3),
-        "confidence_interval": {
-            "lower": round(ensemble - prediction_std * 1.96, 6),
-            "upper": round(ensemble + prediction_std * 1.96, 6),
-        },
-        "individual_predictions": {
-            "lstm": round(lstm_pred, 6),
-            "gru": round(gru_pred, 6),
-            "prophet": round(prophet_pred, 6),
-            "xgboost": round(xgboost_pred, 6),
-        },
-        "model_weights": weights,
-        "prediction_std": round(prediction_std, 6),
-        "timestamp": datetime.now().isoformat(),
-        "data_points_used": 720,
-    }
+    return build_prediction(
+        symbol, timeframe, current_price, tf_mult, min_confidence=0.7
+    )
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application on startup"""
+    global _coingecko_refresh_task
     logger.info("=" * 60)
     logger.info("🚀 Starting Apollon - ZK Oracle Price Oracle API v2.0.0")
     logger.info("=" * 60)
+    # uvicorn's loop="auto" runs on uvloop when it is installed (uvicorn[standard])
+    loop_cls = type(asyncio.get_running_loop())
+    logger.info("Event loop: %s.%s", loop_cls.__module__, loop_cls.__qualname__)
 
     # Start background training
-    asyncio.create_task(initialize_models())
+    schedule_training()
+
+    # Resolve the intents service up front instead of on the first request
+    get_intents_service()
+
+    # Keep token quotes warm in the background
+    _coingecko_refresh_task = asyncio.create_task(_refresh_token_quotes_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and release pooled HTTP connections on shutdown"""
+    if _coingecko_refresh_task is not None:
+        _coingecko_refresh_task.cancel()
+    if _http_client is not None:
+        await _http_client.aclose()
+    if _shade_client is not None:
+        await _shade_client.aclose()
+    if data_aggregator is not None:
+        await data_aggregator.close()
+    if _intents_service is not None:
+        await _intents_service.aclose()
+
+
+# Training runs one at a time; _training_task dedupes scheduling from requests
+_training_lock = asyncio.Lock()
+_training_task: Optional[asyncio.Task] = None
+
+
+def schedule_training() -> asyncio.Task:
+    """Start background training unless a run is already scheduled"""
+    global _training_task
+    if _training_task is None or _training_task.done():
+        _training_task = asyncio.create_task(initialize_models())
+    return _training_task
 
 
 async def initialize_models():
-    """Initialize and train ML models"""
+    """Initialize and train ML models, serialized by the training lock"""
+    async with _training_lock:
+        # A run queued behind the lock has nothing to do once models are ready
+        if app_state["models_trained"]:
+            return
+        await _train_models()
+
+
+# Cap on ZK proofs generated at once; further /predict-zk calls queue here
+ZK_PROOF_CONCURRENCY = 4
+_zk_semaphore = asyncio.Semaphore(ZK_PROOF_CONCURRENCY)
+
+
+async def generate_zk_proof(payload: dict) -> dict:
+    """Run zk_integration.generate_zk_proof under the proof concurrency cap"""
+    async with _zk_semaphore:
+        return await zk_integration.generate_zk_proof(payload)
+
+
+async def _train_models():
     try:
         if app_state["training_in_progress"]:
             return
@@ -340,7 +759,8 @@ async def initialize_models():
         logger.info("📊 Fetching historical data for model training...")
 
         agg = get_data_aggregator()
-        pred = get_predictor()
+        # First use imports the ML engine; keep that off the event loop
+        pred = await asyncio.to_thread(get_predictor)
 
         if agg is None or pred is None:
             logger.warning("⚠️ ML components not available, using mock mode")
@@ -350,21 +770,21 @@ async def initialize_models():
 
         # Try to fetch real data
         try:
-            historical_data = await agg.fetch_historical_data(days=90)
+            historical_data = await fetch_history(agg, days=90)
         except Exception as e:
-            logger.warning(f"⚠️ Could not fetch real data: {e}, using mock data")
+            logger.warning("⚠️ Could not fetch real data: %s, using mock data", e)
             historical_data = generate_mock_historical_data(90)
 
         if historical_data and len(historical_data) > 100:
             logger.info(
-                f"🧠 Training models with {len(historical_data)} data points..."
+                "🧠 Training models with %d data points...", len(historical_data)
             )
             try:
-                await pred.train_models(historical_data)
+                await pred.train_models(to_soa(historical_data))
                 app_state["models_trained"] = True
                 logger.info("✅ Model training completed successfully")
             except Exception as e:
-                logger.error(f"❌ Model training failed: {e}")
+                logger.error("❌ Model training failed: %s", e)
                 app_state["initialization_error"] = str(e)
                 # Use mock mode
                 app_state["models_trained"] = True
@@ -375,7 +795,7 @@ async def initialize_models():
             app_state["models_trained"] = True
 
     except Exception as e:
-        logger.error(f"❌ Model initialization failed: {e}")
+        logger.error("❌ Model initialization failed: %s", e)
         app_state["initialization_error"] = str(e)
         # Still mark as trained to allow mock mode
         app_state["models_trained"] = True
@@ -406,20 +826,34 @@ async def root():
     }
 
 
+# Encoded /health body with the state it was built from; probes hit this
+# every few seconds, so it is re-encoded only when that state changes
+_health_body = [None, b""]
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    status = "healthy" if app_state["models_trained"] else "initializing"
-    if app_state["initialization_error"]:
-        status = "degraded"
-
-    return HealthResponse(
-        status=status,
-        timestamp=datetime.now().isoformat(),
-        models_trained=app_state["models_trained"],
-        last_prediction=app_state.get("last_prediction"),
-        version="2.0.0",
+    key = (
+        now_iso(),
+        app_state["models_trained"],
+        app_state["initialization_error"],
+        app_state.get("last_prediction"),
     )
+    if _health_body[0] != key:
+        ts, models_trained, initialization_error, last_prediction = key
+        status = "healthy" if models_trained else "initializing"
+        if initialization_error:
+            status = "degraded"
+        body = {
+            "status": status,
+            "timestamp": ts,
+            "models_trained": models_trained,
+            "last_prediction": last_prediction,
+            "version": "2.0.0",
+        }
+        _health_body[:] = [key, dumps_json(body)]
+    return Response(content=_health_body[1], media_type="application/json")
 
 
 @app.post("/predict", response_model=PredictionResponse)
@@ -428,117 +862,112 @@ async def get_prediction(request: PredictionRequest):
 
     try:
         logger.info(
-            f"🔮 Generating prediction for {request.symbol}, timeframe: {request.timeframe}"
+            "🔮 Generating prediction for %s, timeframe: %s",
+            request.symbol,
+            request.timeframe,
         )
 
         # Get real current price from CoinGecko
-        symbol_map = {
-            "NEARUSD": "near",
-            "NEAR": "near",
-            "ALGOUSD": "algorand",
-            "ALGO": "algorand",
-            "SOLUSD": "solana",
-            "SOL": "solana",
-            "ETHUSD": "ethereum",
-            "ETH": "ethereum",
-            "BTCUSD": "bitcoin",
-            "BTC": "bitcoin",
-            "AURORAUSD": "aurora-near",
-            "AURORA": "aurora-near",
-        }
+        cg_id = get_coingecko_id(request.symbol)
 
-        cg_id = symbol_map.get(request.symbol.upper(), request.symbol.lower())
-        current_price_data = await get_current_price_from_api(cg_id)
+        # Current price and historical context are independent; fetch together
+        agg = get_data_aggregator()
+        current_price_data, recent_data = await asyncio.gather(
+            get_current_price_from_api(cg_id), fetch_recent_data(agg, cg_id)
+        )
 
         if not current_price_data:
             logger.warning(
-                f"⚠️ Could not fetch real price for {request.symbol}, using fallback"
+                "⚠️ Could not fetch real price for %s, using fallback", request.symbol
             )
             current_price_data = {"price": 0.0, "change_24h": 0.0}
 
         current_price = current_price_data["price"]
 
-        # Get historical data for prediction context
-        agg = get_data_aggregator()
-        pred = get_predictor()
-
-        try:
-            if agg:
-                recent_data = await agg.fetch_historical_data(days=30, symbol=cg_id)
-            else:
-                recent_data = []
-        except Exception as e:
-            logger.warning(f"⚠️ Using minimal data: {e}")
-            recent_data = []
-
         # Generate prediction using real current price as base
-        tf_mult = 1.0
-        if request.timeframe in ("1h", "1H"):
-            tf_mult = 0.0015
-        elif request.timeframe in ("4h", "4H"):
-            tf_mult = 0.004
-        elif request.timeframe in ("24h", "24H", "1d"):
-            tf_mult = 0.015
-        elif request.timeframe in ("7d", "1w"):
-            tf_mult = 0.04
+        tf_mult = _TF_MULT_PRED.get(request.timeframe.lower(), 1.0)
 
         # Generate individual model predictions based on real price
-        lstm_pred = current_price * (1 + np.random.uniform(-0.02, 0.03) * tf_mult)
-        gru_pred = current_price * (1 + np.random.uniform(-0.015, 0.025) * tf_mult)
-        prophet_pred = current_price * (1 + np.random.uniform(-0.01, 0.02) * tf_mult)
-        xgboost_pred = current_price * (1 + np.random.uniform(-0.02, 0.035) * tf_mult)
-
-        # Weighted ensemble
-        weights = {"lstm": 0.35, "gru": 0.25, "prophet": 0.25, "xgboost": 0.15}
-        ensemble = (
-            lstm_pred * weights["lstm"]
-            + gru_pred * weights["gru"]
-            + prophet_pred * weights["prophet"]
-            + xgboost_pred * weights["xgboost"]
+        prediction = build_prediction(
+            request.symbol,
+            request.timeframe,
+            current_price,
+            tf_mult,
+            min_confidence=0.75,
+            data_points_used=len(recent_data) if recent_data else 720,
         )
 
-        prediction_std = np.std([lstm_pred, gru_pred, prophet_pred, xgboost_pred])
-        price_change = ensemble - current_price
-        price_change_percent = (
-            (price_change / current_price) * 100 if current_price > 0 else 0
-        )
-
-        prediction = {
-            "symbol": request.symbol,
-            "timeframe": request.timeframe,
-            "predicted_price": round(ensemble, 6),
-            "current_price": round(current_price, 6),
-            "price_change": round(price_change, 6),
-            "price_change_percent": round(price_change_percent, 2),
-            "confidence": round(np.random.uniform(0.75, 0.95), 3),
-            "confidence_interval": {
-                "lower": round(ensemble - prediction_std * 1.96, 6),
-                "upper": round(ensemble + prediction_std * 1.96, 6),
-            },
-            "individual_predictions": {
-                "lstm": round(lstm_pred, 6),
-                "gru": round(gru_pred, 6),
-                "prophet": round(prophet_pred, 6),
-                "xgboost": round(xgboost_pred, 6),
-            },
-            "model_weights": weights,
-            "prediction_std": round(prediction_std, 6),
-            "timestamp": datetime.now().isoformat(),
-            "data_points_used": len(recent_data) if recent_data else 720,
-        }
-
         # Update app state
         app_state["last_prediction"] = prediction["timestamp"]
 
-        return PredictionResponse(**prediction)
+        return PredictionResponse.model_construct(**prediction)
 
     except Exception as e:
-        logger.error(f"❌ Prediction generation failed: {e}")
+        logger.error("❌ Prediction generation failed: %s", e)
         # Return mock prediction as fallback
         prediction = generate_mock_prediction(
             symbol=request.symbol, timeframe=request.timeframe
         )
-        return PredictionResponse(**prediction)
+        return PredictionResponse.model_construct(**prediction)
+
+
+# Proof metadata reported when no real proof could be generated
+_FALLBACK_ZK_PROOF = {
+    "protocol": "groth16",
+    "curve": "bn128",
+    "verified": True,
+    "proof_type": "ensemble_verification",
+    "generation_time_ms": 350,
+    "fallback": True,
+}
+
+_PRIVACY_STATUS = {
+    "model_weights_hidden": True,
+    "individual_predictions_hidden": True,
+    "circuit_verified": True,
+}
+
+
+async def prove_prediction(prediction: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate the ZK proof for a prediction, or fallback proof metadata"""
+    if zk_integration is None:
+        return dict(_FALLBACK_ZK_PROOF)
+
+    predicted = prediction.get("predicted_price", 0)
+    individual = prediction.get("individual_predictions") or {}
+    proof_input = {
+        "ensemble_prediction": predicted,
+        "confidence": prediction.get("confidence", 0.95),
+    }
+    for key in MODEL_KEYS:
+        proof_input[f"{key}_prediction"] = individual.get(key, predicted)
+
+    try:
+        zk_result = await generate_zk_proof(proof_input)
+    except Exception as zk_error:
+        logger.warning("⚠ ZK proof generation failed, using fallback: %s", zk_error)
+        return dict(_FALLBACK_ZK_PROOF)
+
+    logger.info("✅ Real ZK proof generated successfully")
+    return {
+        **zk_result.get("zk_proof", {}),
+        "protocol": "groth16",
+        "curve": "bn128",
+        "verified": True,
+        "proof_type": "ensemble_verification",
+        "generation_time_ms": zk_result.get("generation_time_ms", 350),
+    }
+
+
+def _assemble_zk_response(
+    prediction: Dict[str, Any], zk_proof: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Merge a prediction with its proof and privacy status"""
+    return {
+        **prediction,
+        "zk_proof": zk_proof,
+        "privacy_status": dict(_PRIVACY_STATUS),
+    }
 
 
 @app.post("/predict-zk", response_model=ZKPredictionResponse)
@@ -547,132 +976,59 @@ async def get_prediction_with_zk_proof(request: PredictionRequest):
 
     if not app_state["models_trained"]:
         if not app_state["training_in_progress"]:
-            asyncio.create_task(initialize_models())
+            schedule_training()
         raise HTTPException(
             status_code=503,
             detail="Models are still training. Please try again in a few minutes.",
         )
 
     try:
-        logger.info(f"🔐 Generating ZK prediction for {request.symbol}")
+        logger.info("🔐 Generating ZK prediction for %s", request.symbol)
 
         # Get regular prediction first
         agg = get_data_aggregator()
-        pred = get_predictor()
+        # A cold predictor imports the ML engine; keep that off the event loop
+        pred = predictor
+        if pred is None:
+            pred = await asyncio.to_thread(get_predictor)
 
         try:
             if agg:
-                recent_data = await agg.fetch_historical_data(days=30)
+                recent_data = await fetch_history(agg, days=30)
             else:
                 recent_data = generate_mock_historical_data(30)
         except:
             recent_data = generate_mock_historical_data(30)
 
-        if pred and hasattr(pred, "predict") and pred.is_trained:
+        if pred and predictor_predict is not None and pred.is_trained:
             if recent_data is None:
                 recent_data = []
-            prediction = await pred.predict(recent_data, request.timeframe)
+            prediction = await predictor_predict(
+                to_soa(recent_data), request.timeframe
+            )
         else:
             current_price = recent_data[-1]["price"] if recent_data else 0.20
-            prediction = generate_mock_prediction(current_price)
-
-        # Add ZK proof (use real ZK integration if available)
-        if zk_integration is not None:
-            try:
-                zk_proof_data = {
-                    "ensemble_prediction": prediction.get(
-                        "ensemble_prediction", prediction.get("predicted_price", 0)
-                    ),
-                    "confidence": prediction.get("confidence", 0.95),
-                    "lstm_prediction": prediction.get(
-                        "lstm_prediction", prediction.get("predicted_price", 0)
-                    ),
-                    "gru_prediction": prediction.get(
-                        "gru_prediction", prediction.get("predicted_price", 0)
-                    ),
-                    "prophet_prediction": prediction.get(
-                        "prophet_prediction", prediction.get("predicted_price", 0)
-                    ),
-                    "xgboost_prediction": prediction.get(
-                        "xgboost_prediction", prediction.get("predicted_price", 0)
-                    ),
-                }
-                zk_result = await zk_integration.generate_zk_proof(zk_proof_data)
-                zk_proof = {
-                    **zk_result.get("zk_proof", {}),
-                    "protocol": "groth16",
-                    "curve": "bn128",
-                    "verified": True,
-                    "proof_type": "ensemble_verification",
-                    "generation_time_ms": zk_result.get("generation_time_ms", 350),
-                }
-                logger.info("✅ Real ZK proof generated successfully")
-            except Exception as zk_error:
-                logger.warning(
-                    f"⚠ ZK proof generation failed, using fallback: {zk_error}"
-                )
-                zk_proof = {
-                    "protocol": "groth16",
-                    "curve": "bn128",
-                    "verified": True,
-                    "proof_type": "ensemble_verification",
-                    "generation_time_ms": 350,
-                    "fallback": True,
-                }
-        else:
-            # Fallback when ZK integration is not available
-            zk_proof = {
-                "protocol": "groth16",
-                "curve": "bn128",
-                "verified": True,
-                "proof_type": "ensemble_verification",
-                "generation_time_ms": 350,
-                "fallback": True,
-            }
+            prediction = generate_mock_prediction(
+                current_price, symbol=request.symbol, timeframe=request.timeframe
+            )
 
+        zk_proof = await prove_prediction(prediction)
         app_state["last_prediction"] = prediction["timestamp"]
 
         logger.info("✅ ZK prediction generated successfully")
-        return ZKPredictionResponse(**zk_response)
+        return ZKPredictionResponse.model_construct(
+            **_assemble_zk_response(prediction, zk_proof)
+        )
 
     except Exception as e:
-        logger.error(f"❌ ZK prediction failed: {e}")
-        # Try real ZK proof generation if available
-        if zk_integration is not None:
-            try:
-                mock_pred = generate_mock_prediction()
-                zk_result = await zk_integration.generate_zk_proof(
-                    {
-                        "ensemble_prediction": mock_pred.get("ensemble_prediction", 0),
-                        "confidence": mock_pred.get("confidence", 0.95),
-                        "lstm_prediction": mock_pred.get("lstm_prediction", 0),
-                        "gru_prediction": mock_pred.get("gru_prediction", 0),
-                        "prophet_prediction": mock_pred.get("prophet_prediction", 0),
-                        "xgboost_prediction": mock_pred.get("xgboost_prediction", 0),
-                    }
-                )
-                zk_proof = {
-                    **zk_result.get("zk_proof", {}),
-                    "protocol": "groth16",
-                    "verified": True,
-                }
-            except Exception as zk_error:
-                logger.warning(f"⚠ ZK proof in error handler also failed: {zk_error}")
-                zk_proof = {"protocol": "groth16", "verified": True, "fallback": True}
-        else:
-            zk_proof = {"protocol": "groth16", "verified": True, "fallback": True}
-
-        prediction = generate_mock_prediction()
-        zk_response = {
-            **prediction,
-            "zk_proof": zk_proof,
-            "privacy_status": {
-                "model_weights_hidden": True,
-                "individual_predictions_hidden": True,
-                "circuit_verified": True,
-            },
-        }
-        return ZKPredictionResponse(**zk_response)
+        logger.error("❌ ZK prediction failed: %s", e)
+        prediction = generate_mock_prediction(
+            symbol=request.symbol, timeframe=request.timeframe
+        )
+        zk_proof = await prove_prediction(prediction)
+        return ZKPredictionResponse.model_construct(
+            **_assemble_zk_response(prediction, zk_proof)
+        )
 
 
 @app.post("/verify-zk")
@@ -695,110 +1051,97 @@ async def verify_zk_proof(proof_data: Dict[str, Any]):
 
         result = {
             "verified": verified,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "public_signals": public_signals,
             "status": "valid" if verified else "invalid",
             "verification_method": "groth16",
             "mock": True,
         }
 
-        logger.info(f"✅ ZK proof verification: {'PASSED' if verified else 'FAILED'}")
+        logger.info("✅ ZK proof verification: %s", "PASSED" if verified else "FAILED")
         return result
 
     except Exception as e:
-        logger.error(f"❌ ZK proof verification error: {e}")
+        logger.error("❌ ZK proof verification error: %s", e)
         raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
 
 
-@app.get("/price/near")
-async def get_near_price():
-    """Proxy NEAR price data from CoinGecko (avoids browser CORS/rate-limit issues)"""
-    import httpx
+def upstream_or_mock(mock_factory, warning: str):
+    """Serve an endpoint's upstream result, falling back to mock data.
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://api.coingecko.com/api/v3/simple/price",
-                params={
-                    "ids": "near",
-                    "vs_currencies": "usd",
-                    "include_24hr_change": "true",
-                    "include_24hr_vol": "true",
-                    "include_market_cap": "true",
-                },
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if data and "near" in data:
-                    return {
-                        "near": data["near"],
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "coingecko",
-                    }
+    The wrapped handler returns None when upstream has no data; that or any
+    error (other than HTTPException) is logged with ``warning`` and answered
+    with ``mock_factory`` called on the handler's arguments.
+    """
 
-        # Fallback mock data
-        logger.warning("⚠️ CoinGecko API unavailable, returning mock NEAR price")
-    except Exception as e:
-        logger.warning(f"⚠️ CoinGecko fetch failed: {e}")
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            try:
+                result = await handler(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.warning("⚠️ %s: %s", warning, e)
+            else:
+                if result is not None:
+                    return result
+                logger.warning("⚠️ %s", warning)
+            return mock_factory(*args, **kwargs)
+
+        return wrapper
 
-    # Return realistic mock data as fallback (Current prices)
-    base_price = 1.06 + np.random.uniform(-0.02, 0.02)
+    return decorator
+
+
+def _mock_near_price():
+    base_price = 1.06 + random.uniform(-0.02, 0.02)
     return {
         "near": {
             "usd": round(base_price, 6),
-            "usd_24h_change": round(np.random.uniform(-2.5, 2.5), 4),
-            "usd_24h_vol": round(np.random.uniform(180_000_000, 350_000_000), 2),
+            "usd_24h_change": round(random.uniform(-2.5, 2.5), 4),
+            "usd_24h_vol": round(random.uniform(180_000_000, 350_000_000), 2),
             "usd_market_cap": round(base_price * 1_180_000_000, 2),
         },
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "source": "mock",
     }
 
 
-@app.get("/price/aurora")
-async def get_aurora_price():
-    """Proxy Aurora price data from CoinGecko"""
-    import httpx
-
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://api.coingecko.com/api/v3/simple/price",
-                params={
-                    "ids": "aurora-near",
-                    "vs_currencies": "usd",
-                    "include_24hr_change": "true",
-                    "include_24hr_vol": "true",
-                    "include_market_cap": "true",
-                },
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if data and "aurora-near" in data:
-                    return {
-                        "aurora": data["aurora-near"],
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "coingecko",
-                    }
-
-        logger.warning("⚠️ CoinGecko API unavailable, returning mock Aurora price")
-    except Exception as e:
-        logger.warning(f"⚠️ CoinGecko Aurora fetch failed: {e}")
-
-    # Return realistic mock data as fallback (Current prices)
-    base_price = 0.031 + np.random.uniform(-0.001, 0.001)
+def _mock_aurora_price():
+    base_price = 0.031 + random.uniform(-0.001, 0.001)
     return {
         "aurora": {
             "usd": round(base_price, 6),
-            "usd_24h_change": round(np.random.uniform(-3.5, 3.5), 4),
-            "usd_24h_vol": round(np.random.uniform(8_000_000, 25_000_000), 2),
+            "usd_24h_change": round(random.uniform(-3.5, 3.5), 4),
+            "usd_24h_vol": round(random.uniform(8_000_000, 25_000_000), 2),
             "usd_market_cap": round(base_price * 280_000_000, 2),
         },
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "source": "mock",
     }
 
 
+@app.get("/price/near")
+@upstream_or_mock(_mock_near_price, "CoinGecko unavailable, returning mock NEAR price")
+async def get_near_price():
+    """Proxy NEAR price data from CoinGecko (avoids browser CORS/rate-limit issues)"""
+    quote = await fetch_coingecko_price("near")
+    if quote is not None:
+        return {"near": quote, "timestamp": now_iso(), "source": "coingecko"}
+
+
+@app.get("/price/aurora")
+@upstream_or_mock(
+    _mock_aurora_price, "CoinGecko unavailable, returning mock Aurora price"
+)
+async def get_aurora_price():
+    """Proxy Aurora price data from CoinGecko"""
+    quote = await fetch_coingecko_price("aurora-near")
+    if quote is not None:
+        return {"aurora": quote, "timestamp": now_iso(), "source": "coingecko"}
+
+
 # =============================================================================
 # Generic Token Price Endpoint (ETH, SOL, ALGO, etc.)
 # =============================================================================
@@ -838,253 +1181,346 @@ TOKEN_CONFIG = {
 }
 
 
-@app.get("/price/token/{token_id}")
-async def get_token_price(token_id: str):
-    """Get price data for any supported token via CoinGecko proxy."""
-    token_id = token_id.lower()
-    config = TOKEN_CONFIG.get(token_id)
+# Static views of TOKEN_CONFIG used on every token price request
+_TOKEN_IDS = tuple(TOKEN_CONFIG)
+_TOKEN_COINGECKO_IDS = tuple(c["coingecko_id"] for c in TOKEN_CONFIG.values())
+_SUPPORTED_TOKENS = ", ".join(TOKEN_CONFIG)
+_TOKEN_ROWS = {token_id: slice(i, i + 1) for i, token_id in enumerate(_TOKEN_IDS)}
 
-    if not config:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported token: {token_id}. Supported: {', '.join(TOKEN_CONFIG.keys())}",
+# Mock quote parameters as arrays in _TOKEN_IDS order
+_MOCK_PRICE = np.array([c["mock_price"] for c in TOKEN_CONFIG.values()])
+_MOCK_MCAP_MULT = np.array([c["mock_mcap_mult"] for c in TOKEN_CONFIG.values()])
+_MOCK_VOL_MIN, _MOCK_VOL_MAX = np.array(
+    [c["mock_vol_range"] for c in TOKEN_CONFIG.values()], dtype=float
+).T
+
+
+def mock_token_quotes(rows: slice = slice(None)) -> Dict[str, Dict[str, float]]:
+    """Mock quotes around each token's mock_price, keyed by token id.
+
+    rows selects tokens by position in _TOKEN_IDS; all tokens by default.
+    """
+    bp = _MOCK_PRICE[rows]
+    draws = rng.uniform(0.0, 1.0, (bp.size, 3))
+    # price within +-1.5%, 24h change within +-4%, volume within mock_vol_range
+    price = bp * (1.0 + (draws[:, 0] - 0.5) * 0.03)
+    change = (draws[:, 1] - 0.5) * 8.0
+    vmin = _MOCK_VOL_MIN[rows]
+    volume = vmin + draws[:, 2] * (_MOCK_VOL_MAX[rows] - vmin)
+    mcap = price * _MOCK_MCAP_MULT[rows]
+    usd = np.where(price < 10, np.round(price, 6), np.round(price, 2))
+
+    return {
+        token_id: {
+            "usd": u,
+            "usd_24h_change": c,
+            "usd_24h_vol": v,
+            "usd_market_cap": m,
+        }
+        for token_id, u, c, v, m in zip(
+            _TOKEN_IDS[rows],
+            usd.tolist(),
+            np.round(change, 4).tolist(),
+            np.round(volume, 2).tolist(),
+            np.round(mcap, 2).tolist(),
         )
+    }
 
-    coingecko_id = config["coingecko_id"]
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://api.coingecko.com/api/v3/simple/price",
-                params={
-                    "ids": coingecko_id,
-                    "vs_currencies": "usd",
-                    "include_24hr_change": "true",
-                    "include_24hr_vol": "true",
-                    "include_market_cap": "true",
-                },
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if data and coingecko_id in data:
-                    return {
-                        "token": token_id,
-                        "data": data[coingecko_id],
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "coingecko",
-                    }
+async def fetch_token_quotes() -> Dict[str, Dict[str, Any]]:
+    """Quotes for all TOKEN_CONFIG tokens keyed by token id (missing on failure).
+
+    Cached ids are served from memory; the misses go out as one batched call.
+    """
+    quotes = await asyncio.gather(*map(fetch_coingecko_price, _TOKEN_COINGECKO_IDS))
+    return {
+        token_id: quote
+        for token_id, quote in zip(_TOKEN_IDS, quotes)
+        if quote is not None
+    }
+
+
+# Background refresh keeps the TOKEN_CONFIG quotes fresh so price requests are
+# normally cache hits; request-path fetches remain as a fallback. It only runs
+# while quotes were requested within the last COINGECKO_REFRESH_IDLE_CYCLES
+# intervals, so an idle worker does not poll CoinGecko.
+COINGECKO_REFRESH_INTERVAL = float(
+    os.getenv("COINGECKO_REFRESH_INTERVAL", COINGECKO_PRICE_TTL / 2)
+)
+COINGECKO_REFRESH_IDLE_CYCLES = 12
+_coingecko_refresh_task: Optional[asyncio.Task] = None
 
-        logger.warning(f"⚠️ CoinGecko unavailable for {token_id}, returning mock")
+
+async def refresh_token_quotes():
+    """Fetch all TOKEN_CONFIG quotes in one request and store them in the cache"""
+    idle_after = COINGECKO_REFRESH_INTERVAL * COINGECKO_REFRESH_IDLE_CYCLES
+    if time.monotonic() - _coingecko_last_demand > idle_after:
+        return
+    if coingecko_circuit_open():
+        return
+    try:
+        quotes = await _request_coingecko_prices(list(_TOKEN_COINGECKO_IDS))
     except Exception as e:
-        logger.warning(f"⚠️ CoinGecko fetch failed for {token_id}: {e}")
+        _record_coingecko_result(False)
+        logger.debug("CoinGecko background refresh failed: %s", e)
+        return
+    _record_coingecko_result(True)
+    now = time.monotonic()
+    for cg_id, quote in quotes.items():
+        _coingecko_cache[cg_id] = (now, quote)
+
+
+async def _refresh_token_quotes_loop():
+    while True:
+        await refresh_token_quotes()
+        await asyncio.sleep(COINGECKO_REFRESH_INTERVAL)
 
-    # Mock fallback
-    bp = config["mock_price"]
-    base_price = bp + np.random.uniform(-bp * 0.015, bp * 0.015)
-    vmin, vmax = config["mock_vol_range"]
+
+def _mock_token_price(token_id: str):
+    token_id = token_id.lower()
     return {
         "token": token_id,
-        "data": {
-            "usd": round(base_price, 6 if base_price < 10 else 2),
-            "usd_24h_change": round(np.random.uniform(-4.0, 4.0), 4),
-            "usd_24h_vol": round(np.random.uniform(vmin, vmax), 2),
-            "usd_market_cap": round(base_price * config["mock_mcap_mult"], 2),
-        },
-        "timestamp": datetime.now().isoformat(),
+        "data": mock_token_quotes(_TOKEN_ROWS[token_id])[token_id],
+        "timestamp": now_iso(),
+        "source": "mock",
+    }
+
+
+def _mock_token_prices():
+    return {
+        "tokens": mock_token_quotes(),
+        "timestamp": now_iso(),
         "source": "mock",
     }
 
 
+@app.get("/price/token/{token_id}")
+@upstream_or_mock(_mock_token_price, "CoinGecko unavailable, returning mock token")
+async def get_token_price(token_id: str):
+    """Get price data for any supported token via CoinGecko proxy."""
+    token_id = token_id.lower()
+    config = TOKEN_CONFIG.get(token_id)
+
+    if not config:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported token: {token_id}. Supported: {_SUPPORTED_TOKENS}",
+        )
+
+    cg_id = config["coingecko_id"]
+    note_quote_demand()
+    entry = _coingecko_cache.get(cg_id)
+    if entry is not None and time.monotonic() - entry[0] < COINGECKO_PRICE_TTL:
+        quote = entry[1]
+    else:
+        # Cold lookups refresh every supported token in the same batched
+        # request, so follow-up calls for other tokens are cache hits
+        quote = (await fetch_token_quotes()).get(token_id)
+    if quote is not None:
+        return {
+            "token": token_id,
+            "data": quote,
+            "timestamp": now_iso(),
+            "source": "coingecko",
+        }
+
+
 @app.get("/price/tokens")
+@upstream_or_mock(
+    _mock_token_prices, "CoinGecko bulk fetch failed, returning mock data"
+)
 async def get_all_token_prices():
     """Get prices for all supported tokens in a single call."""
-    coingecko_ids = ",".join(c["coingecko_id"] for c in TOKEN_CONFIG.values())
+    result = await fetch_token_quotes()
+    if result:
+        return {
+            "tokens": result,
+            "timestamp": now_iso(),
+            "source": "coingecko",
+        }
 
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://api.coingecko.com/api/v3/simple/price",
-                params={
-                    "ids": coingecko_ids,
-                    "vs_currencies": "usd",
-                    "include_24hr_change": "true",
-                    "include_24hr_vol": "true",
-                    "include_market_cap": "true",
-                },
-            )
-            if resp.status_code == 200:
-                raw = resp.json()
-                result = {}
-                for token_id, config in TOKEN_CONFIG.items():
-                    cg_id = config["coingecko_id"]
-                    if cg_id in raw:
-                        result[token_id] = raw[cg_id]
-                if result:
-                    return {
-                        "tokens": result,
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "coingecko",
-                    }
 
-        logger.warning("⚠️ CoinGecko bulk fetch failed, returning mock data")
-    except Exception as e:
-        logger.warning(f"⚠️ Bulk price fetch failed: {e}")
-
-    # Mock fallback for all tokens
-    result = {}
-    for token_id, config in TOKEN_CONFIG.items():
-        bp = config["mock_price"]
-        base_price = bp + np.random.uniform(-bp * 0.015, bp * 0.015)
-        vmin, vmax = config["mock_vol_range"]
-        result[token_id] = {
-            "usd": round(base_price, 6 if base_price < 10 else 2),
-            "usd_24h_change": round(np.random.uniform(-4.0, 4.0), 4),
-            "usd_24h_vol": round(np.random.uniform(vmin, vmax), 2),
-            "usd_market_cap": round(base_price * config["mock_mcap_mult"], 2),
-        }
-    return {
-        "tokens": result,
-        "timestamp": datetime.now().isoformat(),
-        "source": "mock",
-    }
+_TIMESTAMP_SLOT = "__timestamp__"
 
 
-@app.get("/price/current")
-async def get_current_price():
-    """Get current aggregated price from multiple sources"""
-    try:
-        agg = get_data_aggregator()
+def encode_template(payload: Dict[str, Any]) -> tuple:
+    """Encode a static payload once, split around its timestamp value"""
+    head, tail = dumps_json(payload).split(dumps_json(_TIMESTAMP_SLOT))
+    return head, tail
 
-        if agg:
-            try:
-                price_data = await agg.get_aggregated_price()
-                if price_data:
-                    return price_data
-            except Exception as e:
-                logger.warning(f"⚠️ Could not fetch real price: {e}")
 
-        # Mock price data
-        return {
-            "aggregated_price": 0.2054,
-            "price_std": 0.0012,
-            "confidence": 0.994,
-            "source_count": 4,
-            "sources": [
-                {"source": "coinlore", "price": 0.2051, "symbol": "ALGOUSD"},
-                {"source": "cryptonator", "price": 0.2058, "symbol": "ALGOUSD"},
-                {"source": "binance", "price": 0.2053, "symbol": "ALGOUSD"},
-                {"source": "coingecko", "price": 0.2054, "symbol": "ALGOUSD"},
-            ],
-            "timestamp": datetime.now().isoformat(),
+def timestamped_response(template: tuple) -> Response:
+    """Fill a pre-encoded template with the current timestamp"""
+    head, tail = template
+    return Response(
+        content=b'%b"%b"%b' % (head, now_iso().encode(), tail),
+        media_type="application/json",
+    )
+
+
+# Mock bodies for /price/current and /price/technicals, encoded at import
+_MOCK_CURRENT_PRICE = encode_template(
+    {
+        "aggregated_price": 0.2054,
+        "price_std": 0.0012,
+        "confidence": 0.994,
+        "source_count": 4,
+        "sources": [
+            {"source": "coinlore", "price": 0.2051, "symbol": "ALGOUSD"},
+            {"source": "cryptonator", "price": 0.2058, "symbol": "ALGOUSD"},
+            {"source": "binance", "price": 0.2053, "symbol": "ALGOUSD"},
+            {"source": "coingecko", "price": 0.2054, "symbol": "ALGOUSD"},
+        ],
+        "timestamp": _TIMESTAMP_SLOT,
+        "mock": True,
+    }
+)
+_MOCK_TECHNICALS = encode_template(
+    {
+        "symbol": "ALGOUSD",
+        "indicators": {
+            "sma_7": 0.2045,
+            "sma_21": 0.2032,
+            "rsi": 58.4,
+            "bb_upper": 0.2098,
+            "bb_middle": 0.2050,
+            "bb_lower": 0.2002,
+            "current_price": 0.2054,
             "mock": True,
-        }
+        },
+        "timestamp": _TIMESTAMP_SLOT,
+    }
+)
 
-    except Exception as e:
-        logger.error(f"❌ Failed to fetch current price: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/price/current")
+@upstream_or_mock(
+    lambda: timestamped_response(_MOCK_CURRENT_PRICE),
+    "Could not fetch real price, returning mock data",
+)
+async def get_current_price():
+    """Get current aggregated price from multiple sources"""
+    agg = get_data_aggregator()
+    if agg:
+        return await agg.get_aggregated_price() or None
 
 
 @app.get("/price/technicals", response_model=TechnicalIndicatorsResponse)
+@upstream_or_mock(
+    lambda: timestamped_response(_MOCK_TECHNICALS),
+    "Could not calculate real indicators, returning mock data",
+)
 async def get_technical_indicators():
     """Get technical indicators for current market data"""
-    try:
-        # Get recent historical data
-        agg = get_data_aggregator()
-
-        if agg:
-            try:
-                historical_data = await agg.fetch_historical_data(days=30)
-                if historical_data and len(historical_data) >= 20:
-                    indicators = await agg.get_technical_indicators(historical_data)
-                    return TechnicalIndicatorsResponse(
-                        symbol="ALGOUSD",
-                        indicators=indicators,
-                        timestamp=datetime.now().isoformat(),
-                    )
-            except Exception as e:
-                logger.warning(f"⚠️ Could not calculate real indicators: {e}")
+    agg = get_data_aggregator()
+    if not agg:
+        return None
 
-        # Mock indicators
-        return TechnicalIndicatorsResponse(
+    historical_data = await fetch_history(agg, days=30)
+    if historical_data and len(historical_data) >= 20:
+        indicators = await agg.get_technical_indicators(to_soa(historical_data))
+        return TechnicalIndicatorsResponse.model_construct(
             symbol="ALGOUSD",
-            indicators={
-                "sma_7": 0.2045,
-                "sma_21": 0.2032,
-                "rsi": 58.4,
-                "bb_upper": 0.2098,
-                "bb_middle": 0.2050,
-                "bb_lower": 0.2002,
-                "current_price": 0.2054,
-                "mock": True,
-            },
-            timestamp=datetime.now().isoformat(),
+            indicators=indicators,
+            timestamp=now_iso(),
         )
 
-    except Exception as e:
-        logger.error(f"❌ Failed to calculate technical indicators: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+def _wants_ndjson(request: Request, fmt: Optional[str]) -> bool:
+    return fmt == "ndjson" or "application/x-ndjson" in request.headers.get(
+        "accept", ""
+    )
+
+
+def _mock_historical_data(request: Request, days: int = 30, fmt=None):
+    historical_data = generate_mock_historical_data(days)
+    if _wants_ndjson(request, fmt):
+        return StreamingResponse(
+            iter_ndjson(historical_data), media_type="application/x-ndjson"
+        )
+    return {
+        "symbol": "ALGOUSD",
+        "period_days": days,
+        "data_points": len(historical_data),
+        "data": historical_data,
+        "timestamp": now_iso(),
+        "mock": True,
+    }
 
 
 @app.get("/price/historical")
-async def get_historical_data(days: int = 30):
-    """Get historical price data"""
+@upstream_or_mock(
+    _mock_historical_data, "Could not fetch real historical data, returning mock"
+)
+async def get_historical_data(
+    request: Request,
+    days: int = 30,
+    fmt: Optional[str] = Query(None, alias="format"),
+):
+    """Get historical price data
+
+    Pass ``format=ndjson`` or ``Accept: application/x-ndjson`` to stream the
+    rows as newline-delimited JSON instead of a single document.
+    """
     if days > 365:
         raise HTTPException(
             status_code=400, detail="Maximum historical data period is 365 days"
         )
 
-    try:
-        agg = get_data_aggregator()
+    stream = _wants_ndjson(request, fmt)
+    bucket = int(time.time() // HISTORICAL_CACHE_TTL)
+    cached = _historical_cache.get((days, bucket))
+    if cached is not None and not stream:
+        return Response(content=cached, media_type="application/json")
 
-        if agg:
-            try:
-                historical_data = await agg.fetch_historical_data(days=days)
-                if historical_data:
-                    return {
-                        "symbol": "ALGOUSD",
-                        "period_days": days,
-                        "data_points": len(historical_data),
-                        "data": historical_data,
-                        "timestamp": datetime.now().isoformat(),
-                    }
-            except Exception as e:
-                logger.warning(f"⚠️ Could not fetch real historical data: {e}")
-
-        # Mock historical data
-        historical_data = generate_mock_historical_data(days)
+    agg = get_data_aggregator()
+    if not agg:
+        return None
+
+    historical_data = await fetch_history(agg, days=days)
+    if not historical_data:
+        return None
+    if stream:
+        return StreamingResponse(
+            iter_ndjson(historical_data), media_type="application/x-ndjson"
+        )
 
-        return {
+    body = dumps_json(
+        {
             "symbol": "ALGOUSD",
             "period_days": days,
             "data_points": len(historical_data),
             "data": historical_data,
-            "timestamp": datetime.now().isoformat(),
-            "mock": True,
+            "timestamp": now_iso(),
         }
-
-    except Exception as e:
-        logger.error(f"❌ Failed to fetch historical data: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    )
+    # Drop payloads from earlier buckets before storing
+    for key in [k for k in _historical_cache if k[1] != bucket]:
+        del _historical_cache[key]
+    _historical_cache[(days, bucket)] = body
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/models/retrain")
-async def retrain_models(background_tasks: BackgroundTasks):
+async def retrain_models():
     """Trigger model retraining (admin endpoint)"""
     if app_state["training_in_progress"]:
         raise HTTPException(
             status_code=409, detail="Model training already in progress"
         )
 
-    # Reset training state
+    # Reset training state and drop cached history so retraining sees fresh data
     app_state["models_trained"] = False
     app_state["training_in_progress"] = False
+    _history_cache.clear()
+    _historical_cache.clear()
 
     # Start retraining in background
-    background_tasks.add_task(initialize_models)
+    schedule_training()
 
     return {
         "message": "Model retraining started",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "status": "training",
     }
 
@@ -1093,7 +1529,8 @@ async def retrain_models(background_tasks: BackgroundTasks):
 async def get_model_status():
     """Get model training and performance status"""
     try:
-        pred = get_predictor()
+        # Report on the existing predictor without triggering the ML import
+        pred = predictor
 
         status = {
             "models_trained": app_state["models_trained"],
@@ -1112,7 +1549,7 @@ async def get_model_status():
         return status
 
     except Exception as e:
-        logger.error(f"❌ Failed to get model status: {e}")
+        logger.error("❌ Failed to get model status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1134,11 +1571,49 @@ def get_intents_service():
             _intents_service = IntentsService(api_key=api_key)
             logger.info("✓ Intents service initialized")
         except Exception as e:
-            logger.warning(f"⚠ Intents service not available: {e}")
+            logger.warning("⚠ Intents service not available: %s", e)
     return _intents_service
 
 
+def intents_dep():
+    """FastAPI dependency yielding the intents service, or 503 if unavailable"""
+    svc = get_intents_service()
+    if not svc:
+        raise HTTPException(status_code=503, detail="Intents service not available")
+    return svc
+
+
+def intents_endpoint(error_message: str):
+    """Translate intents handler failures into logged 502 responses"""
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await handler(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error("%s: %s", error_message, e)
+                raise HTTPException(status_code=502, detail=str(e))
+
+        return wrapper
+
+    return decorator
+
+
+# Intents request bodies are immutable, reject unknown fields and trim
+# whitespace from pasted addresses/asset ids
+_INTENTS_REQUEST_CONFIG = ConfigDict(
+    frozen=True, extra="forbid", str_strip_whitespace=True
+)
+
+
+# Request field names match the IntentsService keyword arguments, so handlers
+# pass them through with **request.model_dump()
 class SwapQuoteRequest(BaseModel):
+    model_config = _INTENTS_REQUEST_CONFIG
+
     origin_asset: str
     destination_asset: str
     amount: str
@@ -1150,6 +1625,8 @@ class SwapQuoteRequest(BaseModel):
 
 
 class SwapExecuteRequest(BaseModel):
+    model_config = _INTENTS_REQUEST_CONFIG
+
     origin_asset: str
     destination_asset: str
     amount: str
@@ -1160,132 +1637,95 @@ class SwapExecuteRequest(BaseModel):
 
 
 class DepositSubmitRequest(BaseModel):
+    model_config = _INTENTS_REQUEST_CONFIG
+
     tx_hash: str
     deposit_address: str
     near_sender_account: Optional[str] = None
 
 
 class IntentPredictionQuoteRequest(BaseModel):
+    model_config = _INTENTS_REQUEST_CONFIG
+
     origin_asset: str
     amount: str
     recipient_near_account: str
     refund_to: str
 
 
+# Cap on addresses per batch status request
+MAX_BATCH_STATUS_ADDRESSES = 10
+
+
+class BatchStatusRequest(BaseModel):
+    model_config = _INTENTS_REQUEST_CONFIG
+
+    deposit_addresses: List[str] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_STATUS_ADDRESSES
+    )
+
+
 @app.get("/swap/tokens")
-async def get_swap_tokens(chain: Optional[str] = None):
+@intents_endpoint("Failed to fetch swap tokens")
+async def get_swap_tokens(chain: Optional[str] = None, svc=Depends(intents_dep)):
     """Get supported tokens for cross-chain swaps, optionally filtered by chain."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        if chain:
-            tokens = await svc.get_tokens_by_chain(chain)
-        else:
-            tokens = await svc.get_supported_tokens()
-        return {
+    if chain:
+        tokens = await svc.get_tokens_by_chain(chain)
+    else:
+        tokens = await svc.get_supported_tokens()
+    # Token lists are plain upstream JSON, so skip jsonable_encoder
+    return APIJSONResponse(
+        content={
             "tokens": tokens,
             "count": len(tokens),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
-    except Exception as e:
-        logger.error(f"Failed to fetch swap tokens: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    )
 
 
 @app.get("/swap/chains")
-async def get_swap_chains():
+@intents_endpoint("Failed to fetch chains")
+async def get_swap_chains(svc=Depends(intents_dep)):
     """Get list of supported blockchains for swaps."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        chains = await svc.get_supported_chains()
-        return {
+    chains = await svc.get_supported_chains()
+    return APIJSONResponse(
+        {
             "chains": chains,
             "count": len(chains),
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
-    except Exception as e:
-        logger.error(f"Failed to fetch chains: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    )
 
 
 @app.post("/swap/quote")
-async def get_swap_quote(request: SwapQuoteRequest):
+@intents_endpoint("Swap quote failed")
+async def get_swap_quote(request: SwapQuoteRequest, svc=Depends(intents_dep)):
     """Get a swap quote from NEAR Intents 1Click API."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        quote = await svc.request_quote(
-            origin_asset=request.origin_asset,
-            destination_asset=request.destination_asset,
-            amount=request.amount,
-            swap_type=request.swap_type,
-            slippage_tolerance=request.slippage_tolerance,
-            recipient=request.recipient,
-            refund_to=request.refund_to,
-            dry=request.dry,
-        )
-        return quote
-    except Exception as e:
-        logger.error(f"Swap quote failed: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    quote = await svc.request_quote(**request.model_dump())
+    return APIJSONResponse(quote)
 
 
 @app.post("/swap/execute")
-async def execute_swap(request: SwapExecuteRequest):
+@intents_endpoint("Swap execution failed")
+async def execute_swap(request: SwapExecuteRequest, svc=Depends(intents_dep)):
     """Execute a cross-chain swap. Returns deposit address for the user."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        result = await svc.execute_swap(
-            origin_asset=request.origin_asset,
-            destination_asset=request.destination_asset,
-            amount=request.amount,
-            recipient=request.recipient,
-            refund_to=request.refund_to,
-            swap_type=request.swap_type,
-            slippage_tolerance=request.slippage_tolerance,
-        )
-        return result
-    except Exception as e:
-        logger.error(f"Swap execution failed: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    result = await svc.execute_swap(**request.model_dump())
+    return APIJSONResponse(result)
 
 
 @app.get("/swap/status/{deposit_address}")
-async def get_swap_status(deposit_address: str):
+@intents_endpoint("Swap status check failed")
+async def get_swap_status(deposit_address: str, svc=Depends(intents_dep)):
     """Check the status of a cross-chain swap."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        status = await svc.get_swap_status(deposit_address)
-        return status
-    except Exception as e:
-        logger.error(f"Swap status check failed: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    return APIJSONResponse(await svc.get_swap_status(deposit_address))
 
 
 @app.post("/swap/deposit")
-async def submit_swap_deposit(request: DepositSubmitRequest):
+@intents_endpoint("Deposit submit failed")
+async def submit_swap_deposit(request: DepositSubmitRequest, svc=Depends(intents_dep)):
     """Submit deposit tx hash to speed up swap processing."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        result = await svc.submit_deposit(
-            tx_hash=request.tx_hash,
-            deposit_address=request.deposit_address,
-            near_sender_account=request.near_sender_account,
-        )
-        return result
-    except Exception as e:
-        logger.error(f"Deposit submit failed: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    result = await svc.submit_deposit(**request.model_dump())
+    return APIJSONResponse(result)
 
 
 # =============================================================================
@@ -1294,127 +1734,315 @@ async def submit_swap_deposit(request: DepositSubmitRequest):
 
 
 @app.post("/intents/prediction/quote")
-async def get_prediction_payment_quote(request: IntentPredictionQuoteRequest):
+@intents_endpoint("Prediction payment quote failed")
+async def get_prediction_payment_quote(
+    request: IntentPredictionQuoteRequest, svc=Depends(intents_dep)
+):
     """Get a quote for paying for an oracle prediction via cross-chain intent."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        quote = await svc.request_prediction_payment_quote(
-            origin_asset=request.origin_asset,
-            amount=request.amount,
-            recipient_near_account=request.recipient_near_account,
-            refund_to=request.refund_to,
-        )
-        return quote
-    except Exception as e:
-        logger.error(f"Prediction payment quote failed: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    quote = await svc.request_prediction_payment_quote(**request.model_dump())
+    return APIJSONResponse(quote)
 
 
 @app.post("/intents/prediction/execute")
-async def execute_prediction_payment(request: IntentPredictionQuoteRequest):
+@intents_endpoint("Prediction payment execution failed")
+async def execute_prediction_payment(
+    request: IntentPredictionQuoteRequest, svc=Depends(intents_dep)
+):
     """Execute a cross-chain prediction payment. Returns deposit address."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        result = await svc.execute_prediction_payment(
-            origin_asset=request.origin_asset,
-            amount=request.amount,
-            recipient_near_account=request.recipient_near_account,
-            refund_to=request.refund_to,
-        )
-        return result
-    except Exception as e:
-        logger.error(f"Prediction payment execution failed: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    result = await svc.execute_prediction_payment(**request.model_dump())
+    return APIJSONResponse(result)
 
 
 @app.get("/intents/status/{deposit_address}")
-async def get_intent_status(deposit_address: str):
+@intents_endpoint("Intent status check failed")
+async def get_intent_status(deposit_address: str, svc=Depends(intents_dep)):
     """Check status of an intent-based prediction payment."""
-    svc = get_intents_service()
-    if not svc:
-        raise HTTPException(status_code=503, detail="Intents service not available")
-    try:
-        return await svc.get_swap_status(deposit_address)
-    except Exception as e:
-        logger.error(f"Intent status check failed: {e}")
-        raise HTTPException(status_code=502, detail=str(e))
+    return APIJSONResponse(await svc.get_swap_status(deposit_address))
+
+
+@app.post("/intents/status:batch")
+@intents_endpoint("Batch intent status check failed")
+async def get_intent_statuses(request: BatchStatusRequest, svc=Depends(intents_dep)):
+    """Check several intent payments at once; failures are reported per address."""
+    addresses = list(dict.fromkeys(request.deposit_addresses))
+    results = await asyncio.gather(
+        *(svc.get_swap_status(address) for address in addresses),
+        return_exceptions=True,
+    )
+    statuses = {}
+    for address, result in zip(addresses, results):
+        if isinstance(result, Exception):
+            logger.warning("Intent status check failed for %s: %s", address, result)
+            statuses[address] = {"error": str(result)}
+        else:
+            statuses[address] = result
+    return APIJSONResponse({"statuses": statuses, "timestamp": now_iso()})
 
 
 # =============================================================================
 # Shade Agent Status Endpoints
 # =============================================================================
 
+# Shade agent settings, resolved once at import
+SHADE_AGENT_ENABLED = os.environ.get("SHADE_AGENT_ENABLED", "false").lower() == "true"
+SHADE_AGENT_ENDPOINT = os.environ.get("SHADE_AGENT_ENDPOINT", "")
+SHADE_AGENT_ID = os.environ.get("SHADE_AGENT_ID", "")
+
+# Static part of /agent/status; copied per request and filled from the agent
+_STATUS_TEMPLATE = {
+    "enabled": SHADE_AGENT_ENABLED,
+    "agent_id": SHADE_AGENT_ID,
+    "status": "disabled",
+    "last_fulfillment": None,
+    "total_fulfilled": 0,
+    "tee_attestation": None,
+}
+
+# Pooled keep-alive client for the shade agent (base URL from SHADE_AGENT_ENDPOINT).
+# HTTP/2 lets concurrent status/attestation calls share one connection; plain
+# http:// endpoints keep using HTTP/1.1.
+_shade_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shade_client() -> httpx.AsyncClient:
+    global _shade_client
+    if _shade_client is None or _shade_client.is_closed:
+        _shade_client = httpx.AsyncClient(
+            base_url=SHADE_AGENT_ENDPOINT,
+            http2=True,
+            timeout=5.0,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=60.0,
+            ),
+        )
+    return _shade_client
+
+
+# Transient agent failures are retried with capped, jittered exponential backoff
+AGENT_RETRY_ATTEMPTS = 3
+AGENT_RETRY_BASE_DELAY = 0.1  # seconds, doubled per attempt
+AGENT_RETRY_MAX_DELAY = 1.0  # seconds
+_RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+
+# Outbound agent traffic is capped in concurrency and request rate
+AGENT_MAX_CONCURRENCY = 16
+AGENT_MIN_INTERVAL = 1 / 50  # seconds between request starts (50 req/s)
+_agent_semaphore = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+_agent_next_slot = 0.0
+
+
+async def _agent_rate_limit():
+    """Wait for the next free request slot, AGENT_MIN_INTERVAL apart"""
+    global _agent_next_slot
+    now = time.monotonic()
+    slot = max(now, _agent_next_slot)
+    _agent_next_slot = slot + AGENT_MIN_INTERVAL
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+
+async def _fetch_agent(path: str) -> httpx.Response:
+    """GET a shade agent path, retrying timeouts, transport errors and 429/5xx"""
+    delay = AGENT_RETRY_BASE_DELAY
+    for attempt in range(1, AGENT_RETRY_ATTEMPTS + 1):
+        try:
+            async with _agent_semaphore:
+                await _agent_rate_limit()
+                resp = await get_shade_client().get(path)
+            if (
+                resp.status_code not in _RETRYABLE_STATUS
+                or attempt == AGENT_RETRY_ATTEMPTS
+            ):
+                return resp
+        except httpx.TransportError:
+            if attempt == AGENT_RETRY_ATTEMPTS:
+                raise
+        jitter = random.uniform(0.5, 1.5)
+        await asyncio.sleep(min(delay, AGENT_RETRY_MAX_DELAY) * jitter)
+        delay *= 2
+
+
+# Agent payloads keyed by path: (expires_at, payload). Entries are kept past
+# their TTL so the last good payload can be served while the agent is down.
+AGENT_STATUS_TTL = 3.0  # seconds
+AGENT_ATTESTATION_TTL = 60.0  # seconds
+_agent_cache: Dict[str, tuple] = {}
+
+
+def _cached_agent_payload(key: str, stale_ok: bool = False):
+    """Return the cached agent payload if fresh (or any age with stale_ok)"""
+    entry = _agent_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, payload = entry
+    if stale_ok or time.monotonic() < expires_at:
+        return payload
+    return None
+
+
+# Encoded /agent/status body for a disabled agent: (timestamp, bytes), rebuilt
+# at most once per second when the timestamp moves on
+_disabled_status_body = ["", b""]
+
+
+def _disabled_status_response() -> Response:
+    ts = now_iso()
+    if _disabled_status_body[0] != ts:
+        _disabled_status_body[:] = [
+            ts,
+            dumps_json({**_STATUS_TEMPLATE, "timestamp": ts}),
+        ]
+    return Response(content=_disabled_status_body[1], media_type="application/json")
+
 
 @app.get("/agent/status")
 async def get_agent_status():
     """Get Shade Agent oracle status."""
-    agent_enabled = os.environ.get("SHADE_AGENT_ENABLED", "false").lower() == "true"
-    agent_endpoint = os.environ.get("SHADE_AGENT_ENDPOINT", "")
-
-    status = {
-        "enabled": agent_enabled,
-        "agent_id": os.environ.get("SHADE_AGENT_ID", ""),
-        "status": "disabled",
-        "last_fulfillment": None,
-        "total_fulfilled": 0,
-        "tee_attestation": None,
-        "timestamp": datetime.now().isoformat(),
-    }
+    if not (SHADE_AGENT_ENABLED and SHADE_AGENT_ENDPOINT):
+        return _disabled_status_response()
+    return await _agent_status()
 
-    if agent_enabled and agent_endpoint:
+
+async def _agent_status() -> Dict[str, Any]:
+    """Build the agent status payload (also used by /agent/bundle)"""
+    status = {**_STATUS_TEMPLATE, "timestamp": now_iso()}
+
+    if SHADE_AGENT_ENABLED and SHADE_AGENT_ENDPOINT:
+        cached = _cached_agent_payload("status")
+        if cached is not None:
+            return cached
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                resp = await client.get(f"{agent_endpoint}/status")
-                if resp.status_code == 200:
-                    agent_data = resp.json()
-                    status.update(
-                        {
-                            "status": agent_data.get("status", "running"),
-                            "last_fulfillment": agent_data.get("last_fulfillment"),
-                            "total_fulfilled": agent_data.get("total_fulfilled", 0),
-                            "tee_attestation": agent_data.get("tee_attestation"),
-                            "chains": agent_data.get("chains", ["near"]),
-                        }
-                    )
+            resp = await single_flight(
+                "agent:status", lambda: _fetch_agent("/status")
+            )
+            if resp.status_code == 200:
+                agent_data = orjson.loads(resp.content)
+                status.update(
+                    {
+                        "status": agent_data.get("status", "running"),
+                        "last_fulfillment": agent_data.get("last_fulfillment"),
+                        "total_fulfilled": agent_data.get("total_fulfilled", 0),
+                        "tee_attestation": agent_data.get("tee_attestation"),
+                        "chains": agent_data.get("chains", ["near"]),
+                    }
+                )
+                _agent_cache["status"] = (time.monotonic() + AGENT_STATUS_TTL, status)
         except Exception as e:
-            logger.warning(f"Could not reach shade agent: {e}")
+            logger.warning("Could not reach shade agent: %s", e)
+            stale = _cached_agent_payload("status", stale_ok=True)
+            if stale is not None:
+                return {**stale, "stale": True}
             status["status"] = "unreachable"
 
     return status
 
 
-@app.get("/agent/attestation")
-async def get_agent_attestation():
-    """Get Shade Agent TEE remote attestation data."""
-    agent_endpoint = os.environ.get("SHADE_AGENT_ENDPOINT", "")
+# Last encoded attestation: (payload, body bytes, ETag). Re-encoded and
+# re-hashed only when a different payload comes out of _agent_cache.
+_attestation_etag: Optional[tuple] = None
+
+
+def _encoded_attestation(attestation: Dict[str, Any]) -> tuple:
+    """Return (body, etag) for an attestation payload"""
+    global _attestation_etag
+    if _attestation_etag is None or _attestation_etag[0] is not attestation:
+        body = dumps_json(attestation)
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        _attestation_etag = (attestation, body, etag)
+    return _attestation_etag[1], _attestation_etag[2]
+
 
-    if not agent_endpoint:
+@app.get("/agent/attestation")
+async def get_agent_attestation(request: Request):
+    """Get Shade Agent TEE remote attestation data.
+
+    Agent attestations carry an ETag; a matching If-None-Match gets a 304.
+    """
+    attestation = await _agent_attestation()
+    entry = _agent_cache.get("attestation")
+    if entry is None or entry[1] is not attestation:
+        # Not-configured/unreachable placeholders are not cacheable
+        return attestation
+
+    body, etag = _encoded_attestation(attestation)
+    headers = {"ETag": etag, "Cache-Control": "max-age=30"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _agent_attestation() -> Dict[str, Any]:
+    """Fetch the agent attestation payload (also used by /agent/bundle)"""
+    if not SHADE_AGENT_ENDPOINT:
         return {
             "available": False,
             "message": "Shade agent not configured",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
 
+    cached = _cached_agent_payload("attestation")
+    if cached is not None:
+        return cached
+
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(f"{agent_endpoint}/attestation")
-            if resp.status_code == 200:
-                return resp.json()
+        resp = await single_flight(
+            "agent:attestation", lambda: _fetch_agent("/attestation")
+        )
+        if resp.status_code == 200:
+            attestation = orjson.loads(resp.content)
+            _agent_cache["attestation"] = (
+                time.monotonic() + AGENT_ATTESTATION_TTL,
+                attestation,
+            )
+            return attestation
     except Exception as e:
-        logger.warning(f"Could not fetch attestation: {e}")
+        logger.warning("Could not fetch attestation: %s", e)
+        stale = _cached_agent_payload("attestation", stale_ok=True)
+        if stale is not None:
+            return stale
 
     return {
         "available": False,
         "message": "Could not reach shade agent",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
+    }
+
+
+@app.get("/agent/bundle")
+async def get_agent_bundle():
+    """Get Shade Agent status and attestation in one call, fetched concurrently."""
+    status, attestation = await asyncio.gather(
+        _agent_status(), _agent_attestation()
+    )
+    return {
+        "status": status,
+        "attestation": attestation,
+        "timestamp": now_iso(),
     }
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+    # Each worker is a separate process with its own lazily created
+    # predictor/aggregator, so CPU-bound predictions scale across cores
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Auto-reload and per-request access logs are development conveniences
+    debug = os.getenv("DEBUG", "false").lower() == "true"
+
+    # "auto" selects uvloop and httptools (from uvicorn[standard]) when present
+    uvicorn.run(
+        "server:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=workers,
+        reload=debug and workers == 1,  # uvicorn cannot reload multiple workers
+        log_level=os.getenv("LOG_LEVEL", "warning").lower(),
+        access_log=debug,
+        loop="auto",
+        http="auto",
+    )
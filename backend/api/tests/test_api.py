@@ -6,6 +6,7 @@ Tests all API endpoints and core functionality
 import pytest
 import asyncio
 import json
+import time
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 import sys
@@ -85,10 +86,73 @@ class TestAPIEndpoints:
         assert data["status"] in ["healthy", "initializing"]
         assert isinstance(data["models_trained"], bool)
 
+    def test_health_tracks_state_changes(self, monkeypatch):
+        """Test cached health body is rebuilt when app state changes"""
+        import server
+
+        monkeypatch.setitem(server.app_state, "models_trained", False)
+        monkeypatch.setitem(server.app_state, "initialization_error", None)
+        assert client.get("/health").json()["status"] == "initializing"
+
+        monkeypatch.setitem(server.app_state, "models_trained", True)
+        assert client.get("/health").json()["status"] == "healthy"
+
+        monkeypatch.setitem(server.app_state, "initialization_error", "boom")
+        assert client.get("/health").json()["status"] == "degraded"
+
 
 class TestPriceEndpoints:
     """Test price-related endpoints"""
 
+    @pytest.fixture
+    def fake_aggregator(self, monkeypatch, sample_historical_data):
+        """Serve sample history from an in-memory aggregator and record fetches"""
+        import server
+
+        calls = []
+
+        class FakeAggregator:
+            async def fetch_historical_data(self, days=90, symbol="algorand"):
+                calls.append((days, symbol))
+                await asyncio.sleep(0.01)
+                return sample_historical_data
+
+        agg = FakeAggregator()
+        monkeypatch.setattr(server, "get_data_aggregator", lambda: agg)
+        monkeypatch.setattr(server, "_historical_cache", {})
+        monkeypatch.setattr(server, "_history_cache", {})
+        return calls
+
+    @pytest.fixture
+    def coingecko_quote(self):
+        """Quote returned for every known CoinGecko id"""
+        return {"usd": 1.0}
+
+    @pytest.fixture
+    def coingecko_errors(self):
+        """Exceptions raised by the next upstream requests, one per request"""
+        return []
+
+    @pytest.fixture
+    def coingecko_calls(self, monkeypatch, coingecko_quote, coingecko_errors):
+        """Answer CoinGecko batches from memory and record the requested ids"""
+        import server
+
+        calls = []
+
+        async def fake_request(cg_ids):
+            calls.append(sorted(cg_ids))
+            if coingecko_errors:
+                raise coingecko_errors.pop(0)
+            return {cg_id: coingecko_quote for cg_id in cg_ids if cg_id != "unknown"}
+
+        monkeypatch.setattr(server, "_request_coingecko_prices", fake_request)
+        monkeypatch.setattr(server, "_coingecko_cache", {})
+        monkeypatch.setattr(server, "_coingecko_failures", 0)
+        monkeypatch.setattr(server, "_coingecko_probing", False)
+        monkeypatch.setattr(server, "_coingecko_last_demand", float("-inf"))
+        return calls
+
     def test_current_price_endpoint_exists(self):
         """Test current price endpoint exists"""
         response = client.get("/price/current")
@@ -100,11 +164,238 @@ class TestPriceEndpoints:
         response = client.get("/price/technicals")
         assert response.status_code in [200, 503]
 
+    def test_mock_price_bodies(self, monkeypatch):
+        """Test pre-encoded mock bodies carry a fresh timestamp"""
+        import server
+
+        monkeypatch.setattr(server, "get_data_aggregator", lambda: None)
+
+        current = client.get("/price/current").json()
+        assert current["mock"] is True
+        assert datetime.fromisoformat(current["timestamp"])
+        technicals = client.get("/price/technicals").json()
+        assert technicals["indicators"]["rsi"] == 58.4
+        assert datetime.fromisoformat(technicals["timestamp"])
+
+    def test_upstream_error_falls_back_to_mock(self, monkeypatch):
+        """Test an upstream exception is answered with mock data"""
+        import server
+
+        class BrokenAggregator:
+            async def get_aggregated_price(self):
+                raise RuntimeError("all sources down")
+
+        monkeypatch.setattr(server, "get_data_aggregator", BrokenAggregator)
+
+        response = client.get("/price/current")
+        assert response.status_code == 200
+        assert response.json()["mock"] is True
+
     def test_historical_data_endpoint(self):
         """Test historical data endpoint"""
         response = client.get("/price/historical?days=30")
         assert response.status_code in [200, 400, 503]
 
+    def test_historical_data_cached(self, fake_aggregator, sample_historical_data):
+        """Test repeated historical requests reuse the serialized payload"""
+        first = client.get("/price/historical?days=7")
+        second = client.get("/price/historical?days=7")
+        assert first.status_code == 200
+        assert first.json()["data_points"] == len(sample_historical_data)
+        assert second.content == first.content
+        assert fake_aggregator == [(7, "algorand")]
+
+    def test_historical_data_compressed(self, fake_aggregator, sample_historical_data):
+        """Test large historical payloads are gzip-encoded when accepted"""
+        response = client.get(
+            "/price/historical?days=7", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["data_points"] == len(sample_historical_data)
+
+    def test_historical_data_ndjson(self, fake_aggregator, sample_historical_data):
+        """Test historical rows can be streamed as NDJSON"""
+        response = client.get("/price/historical?days=7&format=ndjson")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert len(lines) == len(sample_historical_data)
+        assert json.loads(lines[0])["price"] == sample_historical_data[0]["price"]
+
+    @pytest.mark.asyncio
+    async def test_near_price_single_flight(self, coingecko_calls):
+        """Test concurrent NEAR price requests share one upstream fetch"""
+        import server
+
+        results = await asyncio.gather(*(server.get_near_price() for _ in range(5)))
+        assert all(r["source"] == "coingecko" for r in results)
+        await server.get_near_price()
+        assert coingecko_calls == [["near"]]
+
+    @pytest.mark.asyncio
+    async def test_coingecko_lookups_batched(self, coingecko_calls):
+        """Test concurrent lookups for different ids share one request"""
+        import server
+
+        near, aurora, unknown = await asyncio.gather(
+            server.fetch_coingecko_price("near"),
+            server.fetch_coingecko_price("aurora-near"),
+            server.fetch_coingecko_price("unknown"),
+        )
+        assert near == aurora == {"usd": 1.0}
+        assert unknown is None
+        assert coingecko_calls == [["aurora-near", "near", "unknown"]]
+
+    @pytest.mark.parametrize("coingecko_quote", [{"usd": 2.0}])
+    def test_token_prices_share_cache(self, coingecko_calls):
+        """Test token endpoints reuse cached quotes instead of refetching"""
+        import server
+
+        bulk = client.get("/price/tokens").json()
+        assert bulk["source"] == "coingecko"
+        assert set(bulk["tokens"]) == set(server.TOKEN_CONFIG)
+        single = client.get("/price/token/Ethereum").json()
+        assert single["source"] == "coingecko"
+        assert single["data"] == {"usd": 2.0}
+        assert len(coingecko_calls) == 1
+
+    @pytest.mark.parametrize("coingecko_quote", [{"usd": 3.0}])
+    def test_cold_token_lookup_warms_all_tokens(self, coingecko_calls):
+        """Test a cold single-token lookup fetches every token in one call"""
+        import server
+
+        assert client.get("/price/token/near").json()["data"] == {"usd": 3.0}
+        assert client.get("/price/token/solana").json()["source"] == "coingecko"
+        assert coingecko_calls == [
+            sorted(c["coingecko_id"] for c in server.TOKEN_CONFIG.values())
+        ]
+
+    def test_token_prices_mock_fallback(self, monkeypatch):
+        """Test mock token quotes stay within their configured ranges"""
+        import server
+
+        async def no_quotes():
+            return {}
+
+        monkeypatch.setattr(server, "fetch_token_quotes", no_quotes)
+
+        data = client.get("/price/tokens").json()
+        assert data["source"] == "mock"
+        assert set(data["tokens"]) == set(server.TOKEN_CONFIG)
+        for token_id, quote in data["tokens"].items():
+            config = server.TOKEN_CONFIG[token_id]
+            assert abs(quote["usd"] / config["mock_price"] - 1) <= 0.0151
+            vmin, vmax = config["mock_vol_range"]
+            assert vmin <= quote["usd_24h_vol"] <= vmax
+
+        single = client.get("/price/token/solana").json()
+        assert single["source"] == "mock"
+        assert set(single["data"]) == {
+            "usd",
+            "usd_24h_change",
+            "usd_24h_vol",
+            "usd_market_cap",
+        }
+
+    @pytest.mark.asyncio
+    async def test_coingecko_circuit_breaker(
+        self, monkeypatch, coingecko_calls, coingecko_errors
+    ):
+        """Test repeated CoinGecko failures short-circuit until a probe succeeds"""
+        import server
+
+        threshold = server.COINGECKO_FAIL_THRESHOLD
+        coingecko_errors.extend(
+            RuntimeError("429 Too Many Requests") for _ in range(threshold)
+        )
+        for _ in range(threshold + 3):
+            assert await server.fetch_coingecko_price("near") is None
+        assert len(coingecko_calls) == threshold
+        assert server.coingecko_circuit_open()
+
+        # After the cooldown one probe goes through and closes the circuit
+        monkeypatch.setattr(server, "_coingecko_open_until", 0.0)
+        assert await server.fetch_coingecko_price("near") == {"usd": 1.0}
+        assert not server.coingecko_circuit_open()
+        assert len(coingecko_calls) == threshold + 1
+
+    @pytest.mark.asyncio
+    async def test_coingecko_etag_revalidation(self, monkeypatch):
+        """Test repeat quote requests send If-None-Match and reuse 304 bodies"""
+        import httpx
+        import server
+
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(
+                200, json={"near": {"usd": 1.5}}, headers={"ETag": '"v1"'}
+            )
+
+        monkeypatch.setattr(server, "_coingecko_etags", {})
+        monkeypatch.setattr(
+            server,
+            "_http_client",
+            httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+
+        first = await server._request_coingecko_prices(["near"])
+        second = await server._request_coingecko_prices(["near"])
+        assert first == second == {"near": {"usd": 1.5}}
+        assert seen == [None, '"v1"']
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_warms_cache(self, coingecko_calls):
+        """Test the refresher stores every token quote for request-path hits"""
+        import server
+
+        # No recent demand: the refresher stays idle
+        await server.refresh_token_quotes()
+        assert coingecko_calls == []
+
+        server.note_quote_demand()
+        await server.refresh_token_quotes()
+        quotes = await server.fetch_token_quotes()
+        assert set(quotes) == set(server.TOKEN_CONFIG)
+        assert len(coingecko_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_history_fetch_coalesced(
+        self, fake_aggregator, sample_historical_data
+    ):
+        """Test concurrent predictions for one symbol share a history fetch"""
+        import server
+
+        agg = server.get_data_aggregator()
+        results = await asyncio.gather(
+            *(server.fetch_history(agg, days=30, symbol="near") for _ in range(5)),
+            server.fetch_history(agg, days=30, symbol="solana"),
+        )
+        assert all(r is sample_historical_data for r in results)
+        assert sorted(fake_aggregator) == [(30, "near"), (30, "solana")]
+
+    @pytest.mark.asyncio
+    async def test_coingecko_stale_on_error(self, monkeypatch):
+        """Test an expired quote is served when CoinGecko fails"""
+        import server
+
+        async def failing_request(cg_id):
+            raise RuntimeError("429 Too Many Requests")
+
+        expired = time.monotonic() - server.COINGECKO_PRICE_TTL - 1
+        monkeypatch.setattr(server, "_request_coingecko_price", failing_request)
+        monkeypatch.setattr(
+            server, "_coingecko_cache", {"algorand": (expired, {"usd": 0.2})}
+        )
+
+        price = await server.get_current_price_from_api("algorand")
+        assert price["price"] == 0.2
+        assert await server.get_current_price_from_api("near") is None
+
     def test_historical_data_days_validation(self):
         """Test historical data days parameter validation"""
         response = client.get("/price/historical?days=400")
@@ -139,6 +430,24 @@ class TestPredictionEndpoints:
         response = client.post("/predict-zk", json=prediction_request)
         assert response.status_code in [200, 503, 500]
 
+    def test_predict_zk_returns_proof(self, monkeypatch, prediction_request):
+        """Test ZK prediction succeeds with fallback proof metadata"""
+        import server
+
+        async def no_history(*args, **kwargs):
+            raise RuntimeError("offline")
+
+        monkeypatch.setitem(server.app_state, "models_trained", True)
+        monkeypatch.setattr(server, "fetch_history", no_history)
+        monkeypatch.setattr(server, "zk_integration", None)
+
+        response = client.post("/predict-zk", json=prediction_request)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["symbol"] == prediction_request["symbol"]
+        assert data["zk_proof"]["fallback"] is True
+        assert data["privacy_status"]["circuit_verified"] is True
+
 
 class TestModelEndpoints:
     """Test model management endpoints"""
@@ -151,11 +460,337 @@ class TestModelEndpoints:
         assert "models_trained" in data
         assert "training_in_progress" in data
 
+    @pytest.mark.asyncio
+    async def test_training_scheduled_once(self, monkeypatch):
+        """Test repeated scheduling reuses the in-flight training run"""
+        import server
+
+        runs = []
+
+        async def fake_train():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+
+        monkeypatch.setattr(server, "_train_models", fake_train)
+        monkeypatch.setattr(server, "_training_task", None)
+        monkeypatch.setitem(server.app_state, "models_trained", False)
+
+        first = server.schedule_training()
+        assert server.schedule_training() is first
+        await first
+        assert runs == [1]
+
+    def test_predictor_retried_after_constructor_error(self, monkeypatch):
+        """Test a failing predictor constructor does not disable later attempts"""
+        import server
+        from ml_engine import ensemble_predictor
+
+        attempts = []
+
+        def broken_engine():
+            attempts.append(1)
+            raise RuntimeError("no GPU")
+
+        monkeypatch.setattr(server, "predictor", None)
+        monkeypatch.setattr(server, "_predictor_import_failed", False)
+        monkeypatch.setattr(
+            ensemble_predictor, "EnsemblePredictionEngine", broken_engine
+        )
+
+        assert server.get_predictor() is None
+        assert server.get_predictor() is None
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_predictor_created_once_across_threads(self, monkeypatch):
+        """Test concurrent first calls from worker threads share one predictor"""
+        import server
+        from ml_engine import ensemble_predictor
+
+        created = []
+
+        class SlowEngine:
+            def __init__(self):
+                created.append(self)
+                time.sleep(0.05)
+
+            def predict(self, *args, **kwargs):
+                return {}
+
+        monkeypatch.setattr(server, "predictor", None)
+        monkeypatch.setattr(server, "predictor_predict", None)
+        monkeypatch.setattr(server, "_predictor_import_failed", False)
+        monkeypatch.setattr(ensemble_predictor, "EnsemblePredictionEngine", SlowEngine)
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(server.get_predictor) for _ in range(4))
+        )
+        assert len(created) == 1
+        assert all(r is created[0] for r in results)
+        assert server.predictor_predict.__self__ is created[0]
+
+
+class TestAgentEndpoints:
+    """Test shade agent proxy endpoints"""
+
+    @pytest.fixture
+    def agent_calls(self, monkeypatch):
+        """Route shade agent traffic to an in-memory mock and record paths"""
+        import httpx
+        import server
+
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path == "/attestation":
+                return httpx.Response(200, json={"available": True, "quote": "abc"})
+            return httpx.Response(200, json={"status": "running", "total_fulfilled": 3})
+
+        monkeypatch.setattr(server, "_agent_cache", {})
+        monkeypatch.setattr(server, "SHADE_AGENT_ENABLED", True)
+        monkeypatch.setattr(server, "SHADE_AGENT_ENDPOINT", "http://shade-agent:3100")
+        monkeypatch.setattr(
+            server,
+            "_shade_client",
+            httpx.AsyncClient(
+                base_url="http://shade-agent:3100",
+                transport=httpx.MockTransport(handler),
+            ),
+        )
+        return calls
+
+    def test_agent_status_disabled(self, monkeypatch):
+        """Test a disabled agent is reported without contacting it"""
+        import server
+
+        monkeypatch.setattr(server, "SHADE_AGENT_ENABLED", False)
+        monkeypatch.setattr(server, "_shade_client", None)
+        data = client.get("/agent/status").json()
+        assert data["status"] == "disabled"
+        assert "timestamp" in data
+        assert server._shade_client is None
+
+    def test_agent_status_uses_shared_client(self, agent_calls):
+        """Test agent status is proxied through the pooled client"""
+        response = client.get("/agent/status")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "running"
+        assert data["total_fulfilled"] == 3
+        assert agent_calls == ["/status"]
+
+    def test_agent_attestation(self, agent_calls):
+        """Test attestation payload is passed through"""
+        response = client.get("/agent/attestation")
+        assert response.status_code == 200
+        assert response.json()["quote"] == "abc"
+        assert agent_calls == ["/attestation"]
+
+    def test_agent_attestation_etag(self, agent_calls):
+        """Test unchanged attestations revalidate with 304 Not Modified"""
+        first = client.get("/agent/attestation")
+        etag = first.headers["etag"]
+        second = client.get("/agent/attestation", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        third = client.get("/agent/attestation", headers={"If-None-Match": '"x"'})
+        assert third.status_code == 200
+        assert third.json()["quote"] == "abc"
+        assert agent_calls == ["/attestation"]
+
+    def test_agent_bundle(self, agent_calls):
+        """Test the bundle endpoint returns status and attestation together"""
+        response = client.get("/agent/bundle")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"]["status"] == "running"
+        assert data["attestation"]["quote"] == "abc"
+        assert sorted(agent_calls) == ["/attestation", "/status"]
+
+    @pytest.mark.asyncio
+    async def test_agent_status_single_flight(self, agent_calls):
+        """Test concurrent cold polls share one upstream agent call"""
+        import server
+
+        results = await asyncio.gather(
+            *(server.get_agent_status() for _ in range(5))
+        )
+        assert all(r["status"] == "running" for r in results)
+        assert agent_calls == ["/status"]
+
+    def test_agent_status_retries_transient_errors(self, agent_calls, monkeypatch):
+        """Test a 503 from the agent is retried before giving up"""
+        import httpx
+        import server
+
+        responses = [httpx.Response(503), httpx.Response(200, json={"status": "ok"})]
+
+        def flaky(request):
+            agent_calls.append(request.url.path)
+            return responses.pop(0)
+
+        monkeypatch.setattr(server, "AGENT_RETRY_BASE_DELAY", 0.0)
+        monkeypatch.setattr(
+            server,
+            "_shade_client",
+            httpx.AsyncClient(
+                base_url="http://shade-agent:3100",
+                transport=httpx.MockTransport(flaky),
+            ),
+        )
+        assert client.get("/agent/status").json()["status"] == "ok"
+        assert agent_calls == ["/status", "/status"]
+
+    @pytest.mark.asyncio
+    async def test_agent_rate_limit_spaces_requests(self, monkeypatch):
+        """Test reserved request slots are spaced by the minimum interval"""
+        import server
+
+        monkeypatch.setattr(server, "_agent_next_slot", 0.0)
+        monkeypatch.setattr(server, "AGENT_MIN_INTERVAL", 0.01)
+
+        start = time.monotonic()
+        await asyncio.gather(*(server._agent_rate_limit() for _ in range(4)))
+        assert time.monotonic() - start >= 0.03
+
+    def test_agent_status_cached(self, agent_calls):
+        """Test polls within the TTL are served without calling the agent"""
+        first = client.get("/agent/status").json()
+        second = client.get("/agent/status").json()
+        assert second == first
+        assert agent_calls == ["/status"]
+
+    def test_agent_status_stale_fallback(self, agent_calls, monkeypatch):
+        """Test the last good status is served when the agent is unreachable"""
+        import httpx
+        import server
+
+        client.get("/agent/status")
+        server._agent_cache["status"] = (0.0, server._agent_cache["status"][1])
+
+        def offline(request):
+            raise httpx.ConnectError("agent down")
+
+        monkeypatch.setattr(
+            server,
+            "_shade_client",
+            httpx.AsyncClient(
+                base_url="http://shade-agent:3100",
+                transport=httpx.MockTransport(offline),
+            ),
+        )
+        data = client.get("/agent/status").json()
+        assert data["status"] == "running"
+        assert data["stale"] is True
+
+
+class TestIntentsEndpoints:
+    """Test NEAR Intents proxy endpoints"""
+
+    class FakeIntents:
+        """Stand-in intents service with canned responses"""
+
+        async def get_swap_status(self, deposit_address):
+            if deposit_address == "broken":
+                raise RuntimeError("upstream down")
+            return {"status": "PROCESSING", "depositAddress": deposit_address}
+
+        async def request_prediction_payment_quote(self, **kwargs):
+            return {"quote": kwargs}
+
+    @pytest.fixture
+    def intents(self):
+        from server import intents_dep
+
+        svc = self.FakeIntents()
+        app.dependency_overrides[intents_dep] = lambda: svc
+        yield svc
+        app.dependency_overrides.pop(intents_dep, None)
+
+    def test_status_proxied(self, intents):
+        """Test status is returned from the intents service"""
+        response = client.get("/intents/status/dep-1")
+        assert response.status_code == 200
+        assert response.json()["depositAddress"] == "dep-1"
+
+    def test_prediction_quote_forwards_fields(self, intents):
+        """Test request fields are passed through as service kwargs"""
+        body = {
+            "origin_asset": "nep141:sol.omft.near",
+            "amount": "100",
+            "recipient_near_account": "alice.near",
+            "refund_to": "sol-wallet",
+        }
+        response = client.post("/intents/prediction/quote", json=body)
+        assert response.status_code == 200
+        assert response.json() == {"quote": body}
+
+    def test_prediction_quote_rejects_unknown_fields(self, intents):
+        """Test intents bodies are strict and whitespace-trimmed"""
+        body = {
+            "origin_asset": " nep141:sol.omft.near ",
+            "amount": "100",
+            "recipient_near_account": "alice.near",
+            "refund_to": "sol-wallet",
+        }
+        response = client.post("/intents/prediction/quote", json=body)
+        assert response.json()["quote"]["origin_asset"] == "nep141:sol.omft.near"
+        response = client.post(
+            "/intents/prediction/quote", json={**body, "memo": "hi"}
+        )
+        assert response.status_code == 422
+
+    def test_upstream_error_is_502(self, intents):
+        """Test service failures are translated to 502"""
+        response = client.get("/intents/status/broken")
+        assert response.status_code == 502
+        assert response.json()["detail"] == "upstream down"
+
+    def test_batch_status(self, intents):
+        """Test batch status fans out and isolates per-address failures"""
+        response = client.post(
+            "/intents/status:batch",
+            json={"deposit_addresses": ["dep-1", "broken", "dep-1"]},
+        )
+        assert response.status_code == 200
+        statuses = response.json()["statuses"]
+        assert list(statuses) == ["dep-1", "broken"]
+        assert statuses["dep-1"]["status"] == "PROCESSING"
+        assert statuses["broken"] == {"error": "upstream down"}
+
+    def test_batch_status_limit(self, intents):
+        """Test batch requests above the address cap are rejected"""
+        addresses = [f"dep-{i}" for i in range(11)]
+        response = client.post(
+            "/intents/status:batch", json={"deposit_addresses": addresses}
+        )
+        assert response.status_code == 422
+
+    def test_service_unavailable_is_503(self, monkeypatch):
+        """Test a missing intents service reports 503"""
+        import server
+
+        monkeypatch.setattr(server, "get_intents_service", lambda: None)
+        assert client.get("/swap/chains").status_code == 503
+
 
 # ML Engine Tests
 class TestMLEngine:
     """Test ML Engine components"""
 
+    def test_ensemble_kernel_matches_numpy(self):
+        """Test the ensemble kernel agrees with the NumPy formulation"""
+        import numpy as np
+        from ensemble_kernel import MODEL_WEIGHTS, ensemble_kernel
+
+        returns = np.array([0.02, -0.01, 0.015, -0.005])
+        *preds, ensemble, std = ensemble_kernel(2.0, 0.5, *returns.tolist())
+        expected = 2.0 * (1 + returns * 0.5)
+        assert np.allclose(preds, expected)
+        assert ensemble == pytest.approx(float(expected @ np.array(MODEL_WEIGHTS)))
+        assert std == pytest.approx(float(expected.std()))
+
     @pytest.mark.asyncio
     async def test_ensemble_predictor_initialization(self):
         """Test ensemble predictor can be initialized"""
@@ -204,6 +839,20 @@ class TestDataAggregator:
         except Exception as e:
             pytest.skip(f"Indicators calculation skipped: {e}")
 
+    @pytest.mark.asyncio
+    async def test_technical_indicators_accept_column_arrays(
+        self, sample_historical_data
+    ):
+        """Test indicators match whether rows or column arrays are passed"""
+        from server import to_soa
+
+        aggregator = PriceDataAggregator()
+        from_rows = await aggregator.get_technical_indicators(sample_historical_data)
+        from_soa = await aggregator.get_technical_indicators(
+            to_soa(sample_historical_data)
+        )
+        assert from_soa == from_rows
+
 
 # ZK Integration Tests
 class TestZKIntegration:
@@ -224,6 +873,28 @@ class TestZKIntegration:
         # May fail but endpoint should exist
         assert response.status_code in [200, 400, 500]
 
+    @pytest.mark.asyncio
+    async def test_zk_proof_concurrency_capped(self, monkeypatch):
+        """Test concurrent proof generation is bounded by the semaphore"""
+        import server
+
+        active = []
+        peak = []
+
+        class FakeZK:
+            async def generate_zk_proof(self, payload):
+                active.append(1)
+                peak.append(len(active))
+                await asyncio.sleep(0.01)
+                active.pop()
+                return {"zk_proof": {}}
+
+        monkeypatch.setattr(server, "zk_integration", FakeZK())
+        monkeypatch.setattr(server, "_zk_semaphore", asyncio.Semaphore(2))
+
+        await asyncio.gather(*(server.generate_zk_proof({}) for _ in range(6)))
+        assert max(peak) == 2
+
 
 # Error Handling Tests
 class TestErrorHandling:
@@ -0,0 +1,316 @@
+"""
+Test Suite for the NEAR Intents 1Click client
+Uses httpx.MockTransport so no network access is required
+"""
+
+import pytest
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+import httpx
+import sys
+import os
+
+# Add parent directories to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import intents_service
+from intents_service import (
+    IntentsService,
+    IntentsServiceError,
+    ONECLICK_BASE_URL,
+    TOKEN_CACHE_KEY,
+)
+
+
+SAMPLE_TOKENS = [
+    {"assetId": "nep141:wrap.near", "blockchain": "near", "symbol": "wNEAR"},
+    {"assetId": "nep141:sol.omft.near", "blockchain": "sol", "symbol": "SOL"},
+    {"assetId": "nep141:eth.omft.near", "blockchain": "eth", "symbol": "ETH"},
+    {"assetId": "nep141:usdc.near", "blockchain": "near", "symbol": "USDC"},
+]
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in storing raw values"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+async def make_service(handler, api_key=None, redis_client=None):
+    """Build an IntentsService whose pooled client talks to a mock transport"""
+    svc = IntentsService(api_key=api_key, redis_client=redis_client)
+    pooled = svc._client
+    svc._client = httpx.AsyncClient(
+        base_url=ONECLICK_BASE_URL,
+        headers=pooled.headers,
+        transport=httpx.MockTransport(handler),
+    )
+    await pooled.aclose()
+    return svc
+
+
+class TestIntentsClient:
+    """Test the pooled 1Click HTTP client"""
+
+    @pytest.mark.asyncio
+    async def test_requests_share_one_client(self):
+        """Test every call goes through the same pooled client"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path == "/v0/tokens":
+                return httpx.Response(200, json=SAMPLE_TOKENS)
+            return httpx.Response(200, json={"status": "PROCESSING"})
+
+        svc = await make_service(handler)
+        client = svc._client
+
+        await svc.get_supported_tokens()
+        await svc.get_swap_status("dep-1")
+
+        assert svc._client is client
+        assert calls == ["/v0/tokens", "/v0/status"]
+        await svc.aclose()
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_auth_header_sent(self):
+        """Test API key is sent as a bearer token"""
+        seen = {}
+
+        def handler(request):
+            seen["auth"] = request.headers.get("authorization")
+            return httpx.Response(200, json={"status": "SUCCESS"})
+
+        svc = await make_service(handler, api_key="secret")
+        await svc.get_swap_status("dep-1")
+        assert seen["auth"] == "Bearer secret"
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_http_error_translated(self):
+        """Test upstream HTTP errors surface as IntentsServiceError"""
+
+        def handler(request):
+            return httpx.Response(500, text="boom")
+
+        svc = await make_service(handler)
+        with pytest.raises(IntentsServiceError) as exc_info:
+            await svc.request_quote("nep141:wrap.near", "nep141:usdc.near", "100")
+        assert exc_info.value.status_code == 500
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_quote_payload(self):
+        """Test quote bodies use 1Click field names and a UTC deadline"""
+        seen = {}
+
+        def handler(request):
+            seen["body"] = json.loads(request.content)
+            seen["content_type"] = request.headers["content-type"]
+            return httpx.Response(200, json={"quote": {}})
+
+        svc = await make_service(handler)
+        before = datetime.now(timezone.utc).replace(microsecond=0)
+        await svc.request_quote("nep141:wrap.near", "nep141:usdc.near", "100")
+        deadline = datetime.strptime(seen["body"]["deadline"], "%Y-%m-%dT%H:%M:%SZ")
+        delta = deadline.replace(tzinfo=timezone.utc) - before
+        assert timedelta(minutes=29) < delta <= timedelta(minutes=31)
+        assert seen["body"]["swapType"] == "EXACT_INPUT"
+        assert seen["body"]["refundType"] == "ORIGIN_CHAIN"
+        assert seen["body"]["quoteWaitingTimeMs"] == 3000
+        assert seen["content_type"] == "application/json"
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_request_quotes_fan_out(self):
+        """Test batched quotes keep order and report failures per item"""
+
+        def handler(request):
+            body = json.loads(request.content)
+            if body["originAsset"] == "bad":
+                return httpx.Response(400, text="unsupported asset")
+            return httpx.Response(200, json={"quote": {"origin": body["originAsset"]}})
+
+        svc = await make_service(handler)
+        specs = [
+            {
+                "origin_asset": asset,
+                "destination_asset": "nep141:wrap.near",
+                "amount": "1",
+            }
+            for asset in ("sol", "bad", "eth")
+        ]
+        results = await svc.request_quotes(specs)
+        assert results[0]["quote"]["origin"] == "sol"
+        assert isinstance(results[1], IntentsServiceError)
+        assert results[2]["quote"]["origin"] == "eth"
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_status_not_found(self):
+        """Test unknown deposit addresses report NOT_FOUND"""
+
+        def handler(request):
+            return httpx.Response(404)
+
+        svc = await make_service(handler)
+        status = await svc.get_swap_status("missing")
+        assert status == {"status": "NOT_FOUND", "depositAddress": "missing"}
+        await svc.aclose()
+
+
+class TestTokenCache:
+    """Test token list caching"""
+
+    @pytest.mark.asyncio
+    async def test_redis_round_trip(self):
+        """Test tokens written to Redis are served to a fresh instance"""
+
+        def handler(request):
+            return httpx.Response(200, json=SAMPLE_TOKENS)
+
+        redis = FakeRedis()
+        svc = await make_service(handler, redis_client=redis)
+        await svc.get_supported_tokens()
+        await svc.aclose()
+        assert list(redis.store) == [TOKEN_CACHE_KEY]
+
+        def offline(request):
+            raise AssertionError("should be served from Redis")
+
+        fresh = await make_service(offline, redis_client=redis)
+        assert await fresh.get_supported_tokens() == SAMPLE_TOKENS
+        await fresh.aclose()
+
+    @pytest.mark.asyncio
+    async def test_tokens_by_chain_uses_index(self):
+        """Test chain filtering is case-insensitive and fetches once"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(200, json=SAMPLE_TOKENS)
+
+        svc = await make_service(handler)
+        near_tokens = await svc.get_tokens_by_chain("NEAR")
+        assert [t["symbol"] for t in near_tokens] == ["wNEAR", "USDC"]
+        assert await svc.get_tokens_by_chain("unknown") == []
+        chains = await svc.get_supported_chains()
+        assert {c["id"] for c in chains} == {"near", "sol", "eth"}
+        assert chains[0]["id"] == "near"
+        assert calls == ["/v0/tokens"]
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self):
+        """Test concurrent cold callers trigger a single upstream fetch"""
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url.path)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=SAMPLE_TOKENS)
+
+        svc = await make_service(handler)
+        results = await asyncio.gather(*(svc.get_supported_tokens() for _ in range(10)))
+        assert all(r == SAMPLE_TOKENS for r in results)
+        assert calls == ["/v0/tokens"]
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stale_tokens_served_while_refreshing(self):
+        """Test expired tokens are returned immediately and refreshed behind"""
+        responses = [SAMPLE_TOKENS, SAMPLE_TOKENS[:1]]
+
+        def handler(request):
+            return httpx.Response(200, json=responses.pop(0))
+
+        svc = await make_service(handler)
+        await svc.get_supported_tokens()
+        svc._token_cache_time -= svc._cache_ttl + 1
+
+        assert await svc.get_supported_tokens() == SAMPLE_TOKENS
+        await svc._refresh_task
+        assert await svc.get_supported_tokens() == SAMPLE_TOKENS[:1]
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_malformed_token_list_rejected(self):
+        """Test a non-list token payload is reported instead of cached"""
+
+        def handler(request):
+            return httpx.Response(200, json={"error": "maintenance"})
+
+        svc = await make_service(handler)
+        with pytest.raises(IntentsServiceError):
+            await svc.get_supported_tokens()
+        assert svc._token_cache is None
+        await svc.aclose()
+
+
+class TestSwapStatusCache:
+    """Test swap status caching and request coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_polls_coalesce(self):
+        """Test concurrent polls for one address share an upstream call"""
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url.params["depositAddress"])
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"status": "PROCESSING"})
+
+        svc = await make_service(handler)
+        results = await asyncio.gather(
+            *(svc.get_swap_status("dep-1") for _ in range(5)),
+            svc.get_swap_status("dep-2"),
+        )
+        assert all(r["status"] == "PROCESSING" for r in results)
+        assert sorted(calls) == ["dep-1", "dep-2"]
+
+        # Served from cache within the poll window
+        await svc.get_swap_status("dep-1")
+        assert len(calls) == 2
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_pending_status_expires(self):
+        """Test non-final statuses are re-fetched after the poll window"""
+        statuses = ["PROCESSING", "SUCCESS"]
+
+        def handler(request):
+            return httpx.Response(200, json={"status": statuses.pop(0)})
+
+        svc = await make_service(handler)
+        assert (await svc.get_swap_status("dep-1"))["status"] == "PROCESSING"
+        expires_at, status = svc._status_cache["dep-1"]
+        svc._status_cache["dep-1"] = (expires_at - 2, status)
+        assert (await svc.get_swap_status("dep-1"))["status"] == "SUCCESS"
+        await svc.aclose()
+
+    @pytest.mark.asyncio
+    async def test_status_cache_bounded(self, monkeypatch):
+        """Test the least recently polled address is evicted at capacity"""
+        monkeypatch.setattr(intents_service, "STATUS_CACHE_MAX_ENTRIES", 2)
+
+        def handler(request):
+            return httpx.Response(200, json={"status": "PROCESSING"})
+
+        svc = await make_service(handler)
+        await svc.get_swap_status("dep-1")
+        await svc.get_swap_status("dep-2")
+        await svc.get_swap_status("dep-1")
+        await svc.get_swap_status("dep-3")
+        assert list(svc._status_cache) == ["dep-1", "dep-3"]
+        await svc.aclose()
@@ -0,0 +1 @@
+from .price_aggregator import PriceDataAggregator
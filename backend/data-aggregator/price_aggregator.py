@@ -7,14 +7,18 @@ import asyncio
 import aiohttp
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
+import orjson
 import os
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 
+# Shared generator for synthetic fallback data
+rng = np.random.default_rng()
+
 class PriceDataAggregator:
     def __init__(self):
         self.coingecko_base = "https://api.coingecko.com/api/v3"
@@ -29,22 +33,40 @@ class PriceDataAggregator:
         # Rate limiting
         self.rate_limit_delay = 1  # 1 second between calls
         
+        # Pooled keep-alive session, created on first request
+        self._session = None
+        
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
+    def _get_session(self):
+        """Return the shared aiohttp session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared aiohttp session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        
     async def _make_request(self, url, params=None, headers=None):
         """Make HTTP request with timeout and error handling"""
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-            try:
-                async with session.get(url, params=params, headers=headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        self.logger.error(f"API error {response.status}: {url}")
-                        return None
-            except Exception as e:
-                self.logger.error(f"Request failed: {e}")
-                return None
+        try:
+            async with self._get_session().get(url, params=params, headers=headers) as response:
+                if response.status == 200:
+                    # Parse the raw body with orjson; market_chart payloads run
+                    # to tens of KB of floats
+                    return orjson.loads(await response.read())
+                else:
+                    self.logger.error(f"API error {response.status}: {url}")
+                    return None
+        except Exception as e:
+            self.logger.error(f"Request failed: {e}")
+            return None
     
     async def fetch_coingecko_price(self, symbol="algorand"):
         """Fetch current price from CoinGecko"""
@@ -83,6 +105,7 @@ class PriceDataAggregator:
             if data and 'data' in data:
                 for coin in data['data']:
                     if coin.get('symbol', '').upper() == symbol.upper():
+                        now = datetime.now()
                         return {
                             "source": "coinlore",
                             "symbol": "ALGOUSD",
@@ -90,8 +113,8 @@ class PriceDataAggregator:
                             "change_24h": float(coin.get('percent_change_24h', 0)),
                             "volume_24h": float(coin.get('volume24', 0)),
                             "market_cap": float(coin.get('market_cap_usd', 0)),
-                            "timestamp": datetime.now().timestamp(),
-                            "raw_timestamp": datetime.now().isoformat()
+                            "timestamp": now.timestamp(),
+                            "raw_timestamp": now.isoformat()
                         }
         except Exception as e:
             self.logger.error(f"CoinLore API error: {e}")
@@ -105,6 +128,7 @@ class PriceDataAggregator:
             data = await self._make_request(url)
             if data and data.get('success') and 'ticker' in data:
                 ticker = data['ticker']
+                now = datetime.now()
                 return {
                     "source": "cryptonator",
                     "symbol": "ALGOUSD",
@@ -112,8 +136,8 @@ class PriceDataAggregator:
                     "change_24h": float(ticker.get('change', 0)),
                     "volume_24h": float(ticker.get('volume', 0)),
                     "market_cap": 0,  # Not provided
-                    "timestamp": datetime.now().timestamp(),
-                    "raw_timestamp": datetime.now().isoformat()
+                    "timestamp": now.timestamp(),
+                    "raw_timestamp": now.isoformat()
                 }
         except Exception as e:
             self.logger.error(f"Cryptonator API error: {e}")
@@ -127,6 +151,7 @@ class PriceDataAggregator:
             
             data = await self._make_request(url, params)
             if data:
+                now = datetime.now()
                 return {
                     "source": "binance",
                     "symbol": "ALGOUSD",
@@ -134,8 +159,8 @@ class PriceDataAggregator:
                     "change_24h": float(data.get('priceChangePercent', 0)),
                     "volume_24h": float(data.get('volume', 0)),
                     "market_cap": 0,  # Not provided
-                    "timestamp": datetime.now().timestamp(),
-                    "raw_timestamp": datetime.now().isoformat()
+                    "timestamp": now.timestamp(),
+                    "raw_timestamp": now.isoformat()
                 }
         except Exception as e:
             self.logger.error(f"Binance API error: {e}")
@@ -157,29 +182,28 @@ class PriceDataAggregator:
             "convert": "USD"
         }
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if symbol in data["data"]:
-                            quote = data["data"][symbol]["quote"]["USD"]
-                            return {
-                                "source": "coinmarketcap",
-                                "symbol": "ALGOUSD",
-                                "price": quote["price"],
-                                "change_24h": quote["percent_change_24h"],
-                                "volume_24h": quote["volume_24h"],
-                                "market_cap": quote["market_cap"],
-                                "timestamp": quote["last_updated"],
-                                "raw_timestamp": datetime.now().isoformat()
-                            }
-                    else:
-                        self.logger.error(f"CMC API error: {response.status}")
-                        return None
-            except Exception as e:
-                self.logger.error(f"Error fetching CMC data: {e}")
-                return None
+        try:
+            async with self._get_session().get(url, headers=headers, params=params) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    if symbol in data["data"]:
+                        quote = data["data"][symbol]["quote"]["USD"]
+                        return {
+                            "source": "coinmarketcap",
+                            "symbol": "ALGOUSD",
+                            "price": quote["price"],
+                            "change_24h": quote["percent_change_24h"],
+                            "volume_24h": quote["volume_24h"],
+                            "market_cap": quote["market_cap"],
+                            "timestamp": quote["last_updated"],
+                            "raw_timestamp": datetime.now().isoformat()
+                        }
+                else:
+                    self.logger.error(f"CMC API error: {response.status}")
+                    return None
+        except Exception as e:
+            self.logger.error(f"Error fetching CMC data: {e}")
+            return None
     
     async def fetch_historical_data(self, days=30, symbol="algorand"):
         """Fetch historical price data with fallback to multiple sources"""
@@ -212,22 +236,20 @@ class PriceDataAggregator:
             current_data = await self.get_aggregated_price()
             if current_data:
                 base_price = current_data['aggregated_price']
-                synthetic_data = []
-                
-                for i in range(days * 24):  # Hourly data
-                    timestamp = datetime.now() - timedelta(hours=i)
-                    # Add some realistic price variation
-                    price_variation = np.random.normal(0, 0.02)  # 2% std dev
-                    price = base_price * (1 + price_variation)
-                    
-                    synthetic_data.append({
-                        "datetime": timestamp,
-                        "symbol": "ALGOUSD",
-                        "price": max(0.01, price),  # Ensure positive
-                        "volume": np.random.uniform(1000000, 5000000)
-                    })
-                
-                return list(reversed(synthetic_data))  # Chronological order
+                n = days * 24  # Hourly data
+
+                # Build all rows as arrays in one shot, in chronological order
+                timestamps = pd.date_range(end=datetime.now(), periods=n, freq=pd.Timedelta(hours=1))
+                # Add some realistic price variation (2% std dev), kept positive
+                prices = np.maximum(0.01, base_price * (1 + rng.normal(0, 0.02, n)))
+                volumes = rng.uniform(1000000, 5000000, n)
+
+                return pd.DataFrame({
+                    "datetime": timestamps,
+                    "symbol": "ALGOUSD",
+                    "price": prices,
+                    "volume": volumes
+                }).to_dict("records")
         except Exception as e:
             self.logger.error(f"Error generating fallback data: {e}")
         
@@ -272,40 +294,46 @@ class PriceDataAggregator:
         }
     
     async def get_technical_indicators(self, historical_data):
-        """Calculate basic technical indicators"""
-        if not historical_data or len(historical_data) < 20:
+        """Calculate basic technical indicators
+        
+        Accepts either a list of price rows or a dict of column arrays.
+        """
+        if not historical_data:
             return {}
         
-        df = pd.DataFrame(historical_data)
+        # Only the latest values are reported, so work on the trailing
+        # windows of a contiguous price array instead of full rolling series
+        if isinstance(historical_data, dict):
+            prices = np.asarray(historical_data["price"], dtype=np.float64)
+        else:
+            prices = np.fromiter((row["price"] for row in historical_data), dtype=np.float64, count=len(historical_data))
+        if len(prices) < 20:
+            return {}
         
         # Simple Moving Averages
-        df["sma_7"] = df["price"].rolling(window=7).mean()
-        df["sma_21"] = df["price"].rolling(window=21).mean()
+        sma_7 = prices[-7:].mean()
+        sma_21 = prices[-21:].mean() if len(prices) >= 21 else np.nan
         
-        # RSI calculation
-        delta = df["price"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df["rsi"] = 100 - (100 / (1 + rs))
+        # RSI calculation (14-period simple average of gains/losses)
+        delta = np.diff(prices[-15:])
+        gain = np.maximum(delta, 0).mean()
+        loss = np.maximum(-delta, 0).mean()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - (100 / (1 + gain / loss))
         
         # Bollinger Bands
-        df["bb_middle"] = df["price"].rolling(window=20).mean()
-        bb_std = df["price"].rolling(window=20).std()
-        df["bb_upper"] = df["bb_middle"] + (bb_std * 2)
-        df["bb_lower"] = df["bb_middle"] - (bb_std * 2)
-        
-        # Get latest values
-        latest = df.iloc[-1]
+        window = prices[-20:]
+        bb_middle = window.mean()
+        bb_std = window.std(ddof=1)
         
         return {
-            "sma_7": latest.get("sma_7", 0),
-            "sma_21": latest.get("sma_21", 0),
-            "rsi": latest.get("rsi", 50),
-            "bb_upper": latest.get("bb_upper", 0),
-            "bb_middle": latest.get("bb_middle", 0),
-            "bb_lower": latest.get("bb_lower", 0),
-            "current_price": latest["price"]
+            "sma_7": float(sma_7),
+            "sma_21": float(sma_21),
+            "rsi": float(rsi),
+            "bb_upper": float(bb_middle + bb_std * 2),
+            "bb_middle": float(bb_middle),
+            "bb_lower": float(bb_middle - bb_std * 2),
+            "current_price": float(prices[-1])
         }
 
 # Usage example
@@ -324,6 +352,8 @@ async def main():
         indicators = await aggregator.get_technical_indicators(historical)
         print("\nTechnical Indicators:")
         print(json.dumps(indicators, indent=2))
+    
+    await aggregator.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
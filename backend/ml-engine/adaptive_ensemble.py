@@ -18,6 +18,12 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, mean_absolu
 import warnings
 warnings.filterwarnings('ignore')
 
+# Cyclical encodings for hour-of-day / day-of-week, indexed by the integer value
+_HOUR_ANGLES = 2 * np.pi * np.arange(24) / 24
+_HOUR_SIN, _HOUR_COS = np.sin(_HOUR_ANGLES), np.cos(_HOUR_ANGLES)
+_DOW_ANGLES = 2 * np.pi * np.arange(7) / 7
+_DOW_SIN, _DOW_COS = np.sin(_DOW_ANGLES), np.cos(_DOW_ANGLES)
+
 @dataclass
 class ModelPerformance:
     """Tracks individual model performance over time"""
@@ -211,10 +217,12 @@ class AdaptiveEnsemblePredictor:
         df['price_inertia'] = df['price_roc'].rolling(window=10).mean()
         
         # Cyclical encoding for time features
-        df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-        df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-        df['dow_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-        df['dow_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
+        hours = df['hour'].to_numpy()
+        days = df['day_of_week'].to_numpy()
+        df['hour_sin'] = _HOUR_SIN[hours]
+        df['hour_cos'] = _HOUR_COS[hours]
+        df['dow_sin'] = _DOW_SIN[days]
+        df['dow_cos'] = _DOW_COS[days]
         
         # Lag features with different periods
         for lag in [1, 3, 5, 10, 20]:
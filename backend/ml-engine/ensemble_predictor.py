@@ -3,21 +3,28 @@ Ensemble ML Prediction Engine for Apollon - ZK Oracle Oracle
 Combines LSTM, GRU, Prophet, and XGBoost models for robust price prediction
 """
 
+import math
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import joblib
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import asyncio
 import warnings
 warnings.filterwarnings('ignore')
 
 # Import the copied ML models
-from LSTM import MyLSTM
-from GRU import MyGRU
-from my_prophet import MyProphet
-from my_xgboost import MyXGboost
+if __package__:
+    from .LSTM import MyLSTM
+    from .GRU import MyGRU
+    from .my_prophet import MyProphet
+    from .my_xgboost import MyXGboost
+else:  # run as a script from inside ml-engine/
+    from LSTM import MyLSTM
+    from GRU import MyGRU
+    from my_prophet import MyProphet
+    from my_xgboost import MyXGboost
 
 class EnsemblePredictionEngine:
     def __init__(self, model_weights: Dict[str, float] = None):
@@ -46,12 +53,12 @@ class EnsemblePredictionEngine:
         # Prediction history for accuracy tracking
         self.prediction_history = []
         
-    def prepare_features(self, data: List[Dict]) -> pd.DataFrame:
+    def prepare_features(self, data: Union[List[Dict], Dict[str, np.ndarray]]) -> pd.DataFrame:
         """
         Prepare features for ML models from price data
         
         Args:
-            data: List of price data dictionaries
+            data: List of price data dictionaries, or a dict of column arrays
             
         Returns:
             DataFrame with features for ML models
@@ -137,13 +144,20 @@ class EnsemblePredictionEngine:
         
         return np.array(sequences), np.array(targets)
     
-    async def train_models(self, training_data: List[Dict]):
+    async def train_models(self, training_data: Union[List[Dict], Dict[str, np.ndarray]]):
         """
         Train all models in the ensemble
         
+        Training is CPU-bound, so it runs in a worker thread to keep the
+        event loop responsive.
+        
         Args:
-            training_data: List of historical price data
+            training_data: Historical price data as rows or column arrays
         """
+        await asyncio.to_thread(self._train_models, training_data)
+    
+    def _train_models(self, training_data: Union[List[Dict], Dict[str, np.ndarray]]):
+        """Blocking implementation of train_models"""
         self.logger.info("Starting ensemble model training...")
         
         # Prepare features
@@ -240,18 +254,25 @@ class EnsemblePredictionEngine:
         else:
             raise Exception("All models failed to train")
     
-    async def predict(self, recent_data: List[Dict], 
+    async def predict(self, recent_data: Union[List[Dict], Dict[str, np.ndarray]], 
                      timeframe: str = '24h') -> Dict:
         """
         Generate ensemble prediction
         
+        Model inference runs in a worker thread to keep the event loop responsive.
+        
         Args:
-            recent_data: Recent price data for prediction
+            recent_data: Recent price data for prediction (rows or column arrays)
             timeframe: Prediction timeframe ('1h', '24h', '7d')
             
         Returns:
             Dictionary with prediction results
         """
+        return await asyncio.to_thread(self._predict, recent_data, timeframe)
+    
+    def _predict(self, recent_data: Union[List[Dict], Dict[str, np.ndarray]], 
+                 timeframe: str = '24h') -> Dict:
+        """Blocking implementation of predict"""
         if not self.is_trained:
             raise ValueError("Models not trained. Call train_models() first.")
         
@@ -322,9 +343,13 @@ class EnsemblePredictionEngine:
             ensemble_prediction = weighted_prediction / total_weight
             ensemble_confidence = min(total_weight, 0.95)  # Cap at 95%
         
-        # Calculate prediction range based on model variance
+        # Calculate prediction range based on model variance (population std,
+        # computed inline since there are only a handful of model outputs)
         pred_values = list(predictions.values())
-        prediction_std = np.std(pred_values)
+        mean_pred = sum(pred_values) / len(pred_values)
+        prediction_std = math.sqrt(
+            sum((v - mean_pred) ** 2 for v in pred_values) / len(pred_values)
+        )
         current_price = df['price'].iloc[-1]
         
         # Confidence interval
@@ -400,12 +425,15 @@ async def main():
     dummy_data = []
     
     base_price = 0.20
+    rng = np.random.default_rng()
+    noise = rng.normal(0, 0.01, len(dates))
+    volumes = rng.uniform(1000000, 5000000, len(dates))
     for i, date in enumerate(dates):
-        price = base_price + 0.05 * np.sin(i * 0.1) + np.random.normal(0, 0.01)
+        price = base_price + 0.05 * np.sin(i * 0.1) + noise[i]
         dummy_data.append({
             'datetime': date,
             'price': max(0.1, price),  # Ensure positive price
-            'volume': np.random.uniform(1000000, 5000000)
+            'volume': volumes[i]
         })
     
     print("Training ensemble models...")
@@ -1,9 +1,25 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import random
+import time
 from datetime import datetime
 
-app = FastAPI(title="Apollon Oracle API Mock")
+app = FastAPI(
+    title="Apollon Oracle API Mock", default_response_class=ORJSONResponse
+)
+
+# Response timestamps are rendered at most once per second
+_ts_cache = ["", 0]
+
+
+def now_iso() -> str:
+    """Current local time in ISO format, cached at one-second granularity"""
+    t = int(time.time())
+    if t != _ts_cache[1]:
+        _ts_cache[:] = [datetime.fromtimestamp(t).isoformat(), t]
+    return _ts_cache[0]
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,7 +60,7 @@ def current_price():
                 "change_24h": -0.95,
             },
         ],
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
     }
 
 
@@ -68,7 +84,7 @@ def predict():
             "xgboost": predicted * 1.02,
         },
         "model_weights": {"lstm": 0.35, "gru": 0.25, "prophet": 0.25, "xgboost": 0.15},
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
     }
 
 